@@ -105,7 +105,7 @@ class NIDSAPIServer:
             # Initialize clean alert storage for API access
             if self.nids.alert_manager:
                 # Start with empty alerts - only real attacks will appear
-                self.nids.alert_manager._recent_alerts = []
+                self.nids.alert_manager._recent_alerts.clear()
             
             # Start real packet capture and monitoring
             logger.info("Starting real-time packet capture and monitoring...")
@@ -406,10 +406,7 @@ class NIDSAPIServer:
                 
                 # Also store in alert manager
                 if hasattr(self.nids.alert_manager, '_recent_alerts'):
-                    if self.nids.alert_manager._recent_alerts is None:
-                        self.nids.alert_manager._recent_alerts = []
-                    self.nids.alert_manager._recent_alerts.insert(0, alert_data)
-                    self.nids.alert_manager._recent_alerts = self.nids.alert_manager._recent_alerts[:1000]
+                    self.nids.alert_manager._recent_alerts.appendleft(alert_data)
                 
                 logger.info(f"Real detection added: {alert_data['attack_type']} from {alert_data['src_ip']}")
                 
@@ -496,10 +493,7 @@ class NIDSAPIServer:
                 
                 # Also try to store in alert manager
                 if hasattr(self.nids.alert_manager, '_recent_alerts'):
-                    if self.nids.alert_manager._recent_alerts is None:
-                        self.nids.alert_manager._recent_alerts = []
-                    self.nids.alert_manager._recent_alerts.insert(0, test_alert)
-                    self.nids.alert_manager._recent_alerts = self.nids.alert_manager._recent_alerts[:1000]
+                    self.nids.alert_manager._recent_alerts.appendleft(test_alert)
                 
                 logger.info(f"Test alert added: {test_alert['attack_type']}")
                 
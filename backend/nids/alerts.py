@@ -4,8 +4,10 @@ Alert management system with Windows toast notifications and logging.
 
 import time
 import json
+import itertools
 import uuid
-from typing import Dict, Optional, List
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, List, Tuple
 from pathlib import Path
 from datetime import datetime
 from loguru import logger
@@ -50,7 +52,8 @@ class AlertManager:
                  toast_sound: bool = True,
                  log_file: str = "logs/alerts.jsonl",
                  min_confidence: float = 0.7,
-                 cooldown_seconds: int = 30):
+                 cooldown_seconds: int = 30,
+                 clock: Callable[[], float] = time.monotonic):
         """
         Initialize alert manager.
         
@@ -61,6 +64,7 @@ class AlertManager:
             log_file: Path to alert log file
             min_confidence: Minimum confidence for alerts
             cooldown_seconds: Cooldown period between similar alerts
+            clock: Non-decreasing time source for cooldown tracking (injectable for testing)
         """
         self.toast_enabled = toast_enabled and (WINRT_AVAILABLE or WIN10TOAST_AVAILABLE)
         self.toast_duration = toast_duration
@@ -68,12 +72,18 @@ class AlertManager:
         self.log_file = Path(log_file)
         self.min_confidence = min_confidence
         self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
         
-        # Alert tracking for cooldown
-        self.recent_alerts: Dict[str, float] = {}
+        # Alert tracking for cooldown: alert key -> time of its last alert.
+        # Keys are re-inserted on every alert, so the dict stays ordered by
+        # time and expired entries are always at the front
+        self.recent_alerts: Dict[Tuple[str, str, str], float] = {}
         
-        # In-memory storage for recent alerts (for API access)
-        self._recent_alerts: List[Dict] = []
+        # In-memory storage for recent alerts (for API access), newest first
+        self._recent_alerts: Deque[Dict] = deque(maxlen=1000)
+        
+        # Alert log handle, opened on the first alert and kept open
+        self._log_fh = None
         
         # Initialize toast notifier
         self.toast_notifier = None
@@ -103,9 +113,9 @@ class AlertManager:
             logger.error(f"Failed to initialize toast notifications: {e}")
             self.toast_enabled = False
     
-    def _create_alert_key(self, prediction: ModelPrediction) -> str:
+    def _create_alert_key(self, prediction: ModelPrediction) -> Tuple[str, str, str]:
         """Create unique key for alert cooldown tracking."""
-        return f"{prediction.flow_key.src_ip}:{prediction.flow_key.dst_ip}:{prediction.attack_class or 'attack'}"
+        return (prediction.flow_key.src_ip, prediction.flow_key.dst_ip, prediction.attack_class or 'attack')
     
     def _should_alert(self, prediction: ModelPrediction) -> bool:
         """Check if alert should be generated based on confidence and cooldown."""
@@ -115,18 +125,35 @@ class AlertManager:
         
         # Check cooldown
         alert_key = self._create_alert_key(prediction)
-        current_time = time.time()
+        current_time = self._clock()
+        
+        # Entries past the cooldown can no longer suppress an alert
+        self._expire_alert_keys(current_time - self.cooldown_seconds)
         
-        if alert_key in self.recent_alerts:
-            time_since_last = current_time - self.recent_alerts[alert_key]
-            if time_since_last < self.cooldown_seconds:
-                return False
+        last_alert = self.recent_alerts.get(alert_key)
+        if last_alert is not None and current_time - last_alert < self.cooldown_seconds:
+            return False
         
-        # Update cooldown tracking
+        # Update cooldown tracking, moving the key to the end
+        self.recent_alerts.pop(alert_key, None)
         self.recent_alerts[alert_key] = current_time
         
         return True
     
+    def _expire_alert_keys(self, cutoff: float) -> int:
+        """Drop cooldown entries last alerted before `cutoff`; returns how many."""
+        recent_alerts = self.recent_alerts
+        expired = 0
+        for timestamp in recent_alerts.values():
+            if timestamp >= cutoff:
+                break
+            expired += 1
+        
+        # Oldest entries are first, so only the expired prefix is touched
+        for alert_key in list(itertools.islice(recent_alerts, expired)):
+            del recent_alerts[alert_key]
+        return expired
+    
     def _determine_severity(self, prediction: ModelPrediction) -> str:
         """Determine alert severity based on prediction."""
         confidence = prediction.attack_probability
@@ -231,9 +258,11 @@ class AlertManager:
                 'processing_time_ms': alert.prediction.processing_time_ms
             }
             
-            # Append to JSONL file
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(alert_data) + '\n')
+            # Append to JSONL file; line buffered, so each alert is on disk
+            # as soon as it is written without reopening the file
+            if self._log_fh is None:
+                self._log_fh = open(self.log_file, 'a', encoding='utf-8', buffering=1)
+            self._log_fh.write(json.dumps(alert_data) + '\n')
             
             logger.info(f"Alert logged: {alert.alert_id}")
             
@@ -294,9 +323,8 @@ class AlertManager:
             'flags': 'SYN'  # Default for demo
         }
         
-        # Add to in-memory storage (keep last 1000)
-        self._recent_alerts.insert(0, alert_dict)
-        self._recent_alerts = self._recent_alerts[:1000]
+        # Add to in-memory storage (the deque keeps the last 1000)
+        self._recent_alerts.appendleft(alert_dict)
         
         logger.warning(f"SECURITY ALERT: {alert.description}")
         
@@ -304,18 +332,21 @@ class AlertManager:
     
     def cleanup_old_alerts(self, max_age_seconds: int = 3600):
         """Clean up old alert tracking data."""
-        current_time = time.time()
-        expired_keys = []
+        expired = self._expire_alert_keys(self._clock() - max_age_seconds)
         
-        for alert_key, timestamp in self.recent_alerts.items():
-            if current_time - timestamp > max_age_seconds:
-                expired_keys.append(alert_key)
-        
-        for key in expired_keys:
-            del self.recent_alerts[key]
-        
-        if expired_keys:
-            logger.debug(f"Cleaned up {len(expired_keys)} old alert entries")
+        if expired:
+            logger.debug(f"Cleaned up {expired} old alert entries")
+    
+    def close(self):
+        """Close the alert log file (it is reopened by the next alert)."""
+        if self._log_fh is not None:
+            self._log_fh.close()
+            self._log_fh = None
+    
+    def clear(self):
+        """Forget cooldown tracking and in-memory alerts (useful for testing)."""
+        self.recent_alerts.clear()
+        self._recent_alerts.clear()
     
     def get_recent_alerts(self, limit: int = 100) -> List[Dict]:
         """
@@ -329,7 +360,7 @@ class AlertManager:
         """
         # First try in-memory storage (faster and more reliable)
         if self._recent_alerts:
-            return self._recent_alerts[:limit]
+            return list(itertools.islice(self._recent_alerts, limit))
         
         # Fallback to log file
         alerts = []
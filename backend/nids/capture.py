@@ -90,7 +90,7 @@ class PacketCapture:
                 src_ip = ip_layer.src
                 dst_ip = ip_layer.dst
                 ttl = ip_layer.ttl
-                ip_flags = ip_layer.flags
+                ip_flags = int(ip_layer.flags)
             elif packet.haslayer(IPv6):
                 ip_layer = packet[IPv6]
                 src_ip = ip_layer.src
@@ -111,7 +111,7 @@ class PacketCapture:
                 protocol = "tcp"
                 src_port = tcp_layer.sport
                 dst_port = tcp_layer.dport
-                tcp_flags = tcp_layer.flags
+                tcp_flags = int(tcp_layer.flags)
                 tcp_window = tcp_layer.window
                 tcp_seq = tcp_layer.seq
                 tcp_ack = tcp_layer.ack
@@ -253,6 +253,7 @@ class RealTimeNIDS:
         
         # Final statistics
         self._log_statistics()
+        self.alert_manager.close()
         
         logger.info("Real-time detection stopped")
     
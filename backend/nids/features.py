@@ -3,9 +3,9 @@ Feature extraction module for network intrusion detection.
 Implements sessionization, sliding windows, and comprehensive feature engineering.
 """
 
-import time
 import math
-from typing import Dict, List, Optional, Tuple
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
 from collections import defaultdict, deque
 import numpy as np
 from loguru import logger
@@ -24,6 +24,26 @@ except ImportError:
 from .schemas import PacketInfo, FlowKey, FlowState, FeatureVector
 
 
+@jit(nopython=True, cache=True)
+def _payload_stats_kernel(data: np.ndarray) -> Tuple[float, float]:
+    """Shannon entropy and printable ratio of a non-empty uint8 array."""
+    counts = np.zeros(256, dtype=np.int64)
+    printable = 0
+    for b in data:
+        counts[b] += 1
+        if 32 <= b <= 126:
+            printable += 1
+    
+    length = data.shape[0]
+    entropy = 0.0
+    for count in counts:
+        if count > 0:
+            p = count / length
+            entropy -= p * np.log2(p)
+    
+    return entropy, printable / length
+
+
 class FeatureExtractor:
     """
     Extracts features from network packets for ML model input.
@@ -87,13 +107,35 @@ class FeatureExtractor:
             self.flows[flow_key] = FlowState(
                 flow_key=flow_key,
                 start_time=packet.timestamp,
-                last_seen=packet.timestamp
+                last_seen=packet.timestamp,
+                packet_sizes=np.zeros(self.window_size, dtype=np.float64),
+                inter_arrival_times=np.zeros(self.window_size, dtype=np.float64)
             )
         
         return self.flows[flow_key]
     
     def _update_flow_state(self, flow: FlowState, packet: PacketInfo):
         """Update flow state with new packet."""
+        n = flow.src_packets + flow.dst_packets  # Packets seen before this one
+        
+        # Update timing statistics (ring buffers, see FlowState). The value
+        # being overwritten leaves the window, so it drops out of the running
+        # sums; unfilled slots are zero
+        if n:
+            i = (n - 1) % self.window_size
+            iat = packet.timestamp - flow.last_seen
+            old = round(float(flow.inter_arrival_times[i]) * 1e9)
+            flow.inter_arrival_times[i] = iat
+            iat_ns = round(iat * 1e9)
+            flow.iat_sum += iat_ns - old
+            flow.iat_sq_sum += iat_ns * iat_ns - old * old
+        
+        i = n % self.window_size
+        size = int(packet.packet_size)
+        old = int(flow.packet_sizes[i])
+        flow.packet_sizes[i] = size
+        flow.size_sum += size - old
+        flow.size_sq_sum += size * size - old * old
         flow.last_seen = packet.timestamp
         
         # Determine direction (0=src->dst, 1=dst->src)
@@ -115,21 +157,6 @@ class FeatureExtractor:
                 flow.fin_count += 1
             if packet.tcp_flags & 0x04:  # RST
                 flow.rst_count += 1
-        
-        # Update timing statistics
-        if flow.recent_packets:
-            last_time = flow.recent_packets[-1].timestamp
-            iat = packet.timestamp - last_time
-            flow.inter_arrival_times.append(iat)
-        
-        flow.packet_sizes.append(packet.packet_size)
-        flow.recent_packets.append(packet)
-        
-        # Maintain sliding window
-        if len(flow.recent_packets) > self.window_size:
-            flow.recent_packets.pop(0)
-            flow.inter_arrival_times = flow.inter_arrival_times[-self.window_size:]
-            flow.packet_sizes = flow.packet_sizes[-self.window_size:]
     
     def _cleanup_expired_flows(self):
         """Remove expired flows to prevent memory leaks."""
@@ -159,22 +186,37 @@ class FeatureExtractor:
             return 0.0
         
         # Count byte frequencies
-        counts = np.zeros(256, dtype=np.int32)
-        for byte in data:
-            counts[byte] += 1
-        
-        # Calculate entropy
-        entropy = 0.0
-        length = len(data)
-        for count in counts:
-            if count > 0:
-                p = count / length
-                entropy -= p * math.log2(p)
-        
-        return entropy
+        counts = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+        return self._entropy_from_counts(counts, len(data))
+    
+    @staticmethod
+    def _entropy_from_counts(counts: np.ndarray, length: int) -> float:
+        """Shannon entropy from a 256-bin byte histogram."""
+        if counts.max() == length:
+            return 0.0  # Single repeated byte (e.g. zero padding)
+        p = counts[counts > 0] / length
+        return float(-(p * np.log2(p)).sum())
     
-    def _extract_payload_features(self, packet: PacketInfo) -> Dict[str, float]:
-        """Extract payload-based features."""
+    def _payload_stats(self, payload: bytes) -> Tuple[float, float]:
+        """Entropy and printable character ratio of a (truncated, non-empty) payload."""
+        data = np.frombuffer(payload, dtype=np.uint8)
+        if self.use_numba:
+            entropy, printable_ratio = _payload_stats_kernel(data)
+            return float(entropy), float(printable_ratio)
+        
+        counts = np.bincount(data, minlength=256)
+        printable_count = int(counts[32:127].sum())
+        return self._entropy_from_counts(counts, len(payload)), printable_count / len(payload)
+    
+    def _extract_payload_features(self, packet: PacketInfo,
+                                  stats_cache: Optional[Dict[bytes, Tuple[float, float]]] = None
+                                  ) -> Dict[str, float]:
+        """
+        Extract payload-based features.
+        
+        If `stats_cache` is given, entropy and printable ratio are looked up
+        by payload bytes and only computed for payloads not seen before.
+        """
         features = {
             'payload_entropy': 0.0,
             'printable_ratio': 0.0,
@@ -188,12 +230,14 @@ class FeatureExtractor:
         # Limit payload analysis
         payload = packet.payload[:self.max_payload_bytes]
         
-        # Calculate entropy
-        features['payload_entropy'] = self._calculate_entropy(payload)
-        
-        # Calculate printable character ratio
-        printable_count = sum(1 for b in payload if 32 <= b <= 126)
-        features['printable_ratio'] = printable_count / len(payload)
+        # Entropy and printable character ratio
+        if stats_cache is None:
+            stats = self._payload_stats(payload)
+        else:
+            stats = stats_cache.get(payload)
+            if stats is None:
+                stats = stats_cache[payload] = self._payload_stats(payload)
+        features['payload_entropy'], features['printable_ratio'] = stats
         
         # DNS-specific features
         if packet.protocol == 'udp' and packet.dst_port == 53:
@@ -222,6 +266,17 @@ class FeatureExtractor:
         
         return features
     
+    @staticmethod
+    def _window_mean_std(total: int, sq_total: int, count: int,
+                         scale: float = 1.0) -> Tuple[float, float]:
+        """Mean and population standard deviation from a window's integer running sums."""
+        mean = total / count / scale
+        if count < 2:
+            return mean, 0.0
+        # count^2 * variance, exact in integer arithmetic (so 0 for a constant window)
+        spread = count * sq_total - total * total
+        return mean, math.sqrt(spread) / count / scale
+    
     def _calculate_window_features(self, flow: FlowState) -> Dict[str, float]:
         """Calculate sliding window statistical features."""
         features = {
@@ -232,19 +287,20 @@ class FeatureExtractor:
             'burstiness': 0.0
         }
         
-        if not flow.packet_sizes:
+        n = flow.src_packets + flow.dst_packets
+        if not n:
             return features
         
-        # Packet size statistics
-        sizes = np.array(flow.packet_sizes)
-        features['size_mean'] = float(np.mean(sizes))
-        features['size_std'] = float(np.std(sizes)) if len(sizes) > 1 else 0.0
+        # Packet size statistics, from the running sums over the ring buffer
+        features['size_mean'], features['size_std'] = self._window_mean_std(
+            flow.size_sum, flow.size_sq_sum, min(n, self.window_size)
+        )
         
         # Inter-arrival time statistics
-        if flow.inter_arrival_times:
-            iats = np.array(flow.inter_arrival_times)
-            features['iat_mean'] = float(np.mean(iats))
-            features['iat_std'] = float(np.std(iats)) if len(iats) > 1 else 0.0
+        if n > 1:
+            features['iat_mean'], features['iat_std'] = self._window_mean_std(
+                flow.iat_sum, flow.iat_sq_sum, min(n - 1, self.window_size), scale=1e9
+            )
             
             # Burstiness metric (coefficient of variation)
             if features['iat_mean'] > 0:
@@ -262,6 +318,31 @@ class FeatureExtractor:
         Returns:
             FeatureVector with extracted features
         """
+        return self._extract_features(packet)
+    
+    def extract_features_batch(self, packets: Iterable[PacketInfo]) -> List[FeatureVector]:
+        """
+        Extract features for a sequence of packets, in order.
+        
+        Flow state is still updated packet by packet, so the result matches
+        calling extract_features on each packet; payload statistics are
+        computed once per distinct payload in the batch.
+        
+        Args:
+            packets: Input packets in arrival order; any iterable, so a
+                generator is consumed in a single streaming pass
+            
+        Returns:
+            One FeatureVector per packet
+        """
+        stats_cache: Dict[bytes, Tuple[float, float]] = {}
+        extract = self._extract_features
+        return [extract(packet, stats_cache) for packet in packets]
+    
+    def _extract_features(self, packet: PacketInfo,
+                          stats_cache: Optional[Dict[bytes, Tuple[float, float]]] = None
+                          ) -> FeatureVector:
+        """Feature extraction for one packet; see extract_features."""
         # Update flow state
         flow = self._get_or_create_flow(packet)
         self._update_flow_state(flow, packet)
@@ -270,10 +351,12 @@ class FeatureExtractor:
         direction = 0 if (packet.src_ip == flow.flow_key.src_ip and 
                          packet.src_port == flow.flow_key.src_port) else 1
         
-        # Calculate inter-arrival delta
+        n = flow.src_packets + flow.dst_packets
+        
+        # Calculate inter-arrival delta (latest entry of the IAT ring buffer)
         inter_arrival_delta = 0.0
-        if len(flow.recent_packets) > 1:
-            inter_arrival_delta = packet.timestamp - flow.recent_packets[-2].timestamp
+        if n > 1:
+            inter_arrival_delta = float(flow.inter_arrival_times[(n - 2) % self.window_size])
         
         # Basic packet features
         tcp_flags_bitmap = packet.tcp_flags if packet.tcp_flags is not None else 0
@@ -281,7 +364,7 @@ class FeatureExtractor:
         
         # Flow-level features
         total_bytes = float(flow.src_bytes + flow.dst_bytes)
-        total_packets = float(flow.src_packets + flow.dst_packets)
+        total_packets = float(n)
         
         # Avoid division by zero
         bytes_ratio = (flow.src_bytes / max(flow.dst_bytes, 1)) if flow.dst_bytes > 0 else 0.0
@@ -301,7 +384,7 @@ class FeatureExtractor:
         window_features = self._calculate_window_features(flow)
         
         # Payload features
-        payload_features = self._extract_payload_features(packet)
+        payload_features = self._extract_payload_features(packet, stats_cache)
         
         # Cleanup expired flows periodically
         self._cleanup_expired_flows()
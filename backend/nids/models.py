@@ -4,9 +4,11 @@ Handles feature scaling, encoding, and prediction with bit-for-bit compatibility
 """
 
 import json
+import math
 import time
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Any
 from pathlib import Path
+from collections import deque
 import numpy as np
 from loguru import logger
 
@@ -20,7 +22,128 @@ except ImportError:
     logger.error("Required packages not available. Run: pip install scipy scikit-learn")
     SKLEARN_AVAILABLE = False
 
-from .schemas import FeatureVector, ModelPrediction, FlowKey
+try:
+    import h5py
+    H5PY_AVAILABLE = True
+except ImportError:
+    H5PY_AVAILABLE = False
+
+try:
+    from numba import jit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    # Create dummy decorator
+    def jit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+from .schemas import FeatureVector, ModelPrediction, FlowKey, feature_extractors
+
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+# Initial row capacity of SimpleModelAdapter's per-flow arrays
+FLOW_TABLE_INITIAL_SIZE = 1024
+
+# SimpleModelAdapter latency sampling
+TIMING_SAMPLE_INTERVAL = 64
+LATENCY_EMA_ALPHA = 0.2
+
+_COMMON_PORTS = frozenset({21, 22, 23, 25, 53, 80, 110, 143, 443, 993, 995, 3389})
+
+# HDF5 superblock signature; MATLAB v7.3 files place it after a 512-byte header
+_HDF5_SIGNATURE = b'\x89HDF\r\n\x1a\n'
+
+
+def _is_hdf5_file(path: str) -> bool:
+    """Check whether a file is HDF5 (MATLAB v7.3) rather than a legacy .mat file."""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(520)
+    except OSError:
+        return False
+    return header[:8] == _HDF5_SIGNATURE or header[512:520] == _HDF5_SIGNATURE
+
+
+def _logit(p: float) -> float:
+    """Inverse sigmoid, so a probability threshold can be compared in score space."""
+    if p <= 0.0:
+        return -math.inf
+    if p >= 1.0:
+        return math.inf
+    return math.log(p / (1.0 - p))
+
+
+@jit(nopython=True, cache=True)
+def _tree_predict_proba(X, feature, threshold, children_left, children_right, value):
+    """
+    Class probabilities of a fitted decision tree for each row of X.
+    
+    Walks the flattened sklearn tree arrays directly; leaves are the nodes
+    with children_left == -1 and value holds one class distribution per node.
+    """
+    n_samples = X.shape[0]
+    probs = np.empty((n_samples, value.shape[1]), dtype=np.float64)
+    for i in range(n_samples):
+        node = 0
+        while children_left[node] != -1:
+            if X[i, feature[node]] <= threshold[node]:
+                node = children_left[node]
+            else:
+                node = children_right[node]
+        probs[i, :] = value[node]
+    return probs
+
+
+def _tree_arrays(model) -> Optional[Tuple[np.ndarray, ...]]:
+    """
+    Node arrays of a fitted sklearn decision tree, in _tree_predict_proba order.
+    
+    Returns None for models that are not single decision trees.
+    """
+    tree = getattr(model, 'tree_', None)
+    if tree is None:
+        return None
+    
+    # Normalise leaf counts to class distributions (single output)
+    value = np.asarray(tree.value[:, 0, :], dtype=np.float64)
+    totals = value.sum(axis=1, keepdims=True)
+    totals[totals == 0] = 1.0
+    return (
+        np.ascontiguousarray(tree.feature, dtype=np.int64),
+        np.ascontiguousarray(tree.threshold, dtype=np.float64),
+        np.ascontiguousarray(tree.children_left, dtype=np.int64),
+        np.ascontiguousarray(tree.children_right, dtype=np.int64),
+        np.ascontiguousarray(value / totals),
+    )
+
+
+def _splitmix64(x: int) -> int:
+    """SplitMix64 finalizer: cheap, well-mixed and deterministic across runs."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+def _packet_score(packet_size, payload_entropy, burstiness):
+    """
+    SimpleModelAdapter score terms that depend only on the packet itself.
+    
+    Works element-wise on NumPy arrays as well as on Python scalars.
+    """
+    # === PACKET SIZE ANOMALIES ===
+    # Very small (< 64) or very large (> 1400) packets
+    score = 0.2 * ((packet_size < 64) | (packet_size > 1400))
+    
+    # === PAYLOAD ANALYSIS ===
+    # High entropy suggests encrypted/compressed malicious payload
+    score = score + 0.3 * (payload_entropy > 7.5)
+    
+    # === BURST DETECTION ===
+    # Sudden bursts of traffic
+    return score + 0.2 * (burstiness > 2.0)
 
 
 class MATLABModelAdapter:
@@ -32,7 +155,8 @@ class MATLABModelAdapter:
     def __init__(self, 
                  binary_model_path: str,
                  multiclass_model_path: Optional[str] = None,
-                 metadata_paths: Optional[Dict[str, str]] = None):
+                 metadata_paths: Optional[Dict[str, str]] = None,
+                 loader: str = 'auto'):
         """
         Initialize model adapter.
         
@@ -40,31 +164,104 @@ class MATLABModelAdapter:
             binary_model_path: Path to binary classifier .mat file
             multiclass_model_path: Path to multiclass classifier .mat file
             metadata_paths: Paths to exported metadata files
+            loader: .mat reader: 'auto' (h5py for v7.3 files, scipy otherwise),
+                'h5py' or 'scipy'
         """
         if not SKLEARN_AVAILABLE:
             raise RuntimeError("scikit-learn and scipy required for model adapter")
+        if loader not in ('auto', 'h5py', 'scipy'):
+            raise ValueError(f"Unknown .mat loader: {loader}")
+        if loader == 'h5py' and not H5PY_AVAILABLE:
+            raise RuntimeError("h5py required for loader='h5py'. Run: pip install h5py")
         
         self.binary_model_path = binary_model_path
         self.multiclass_model_path = multiclass_model_path
         self.metadata_paths = metadata_paths or {}
+        self.loader = loader
         
         # Model components
         self.binary_model = None
         self.multiclass_model = None
         self.scaler = None
-        self.feature_order: List[str] = []
+        self.feature_order: Sequence[str] = []
         self.class_names: List[str] = []
         self.binary_threshold = 0.5
+        self._logit_threshold = _logit(self.binary_threshold)
+        
+        # Reused model input buffer (see _prepare_features)
+        self._X_buf: Optional[np.ndarray] = None
+        
+        # Flattened decision tree arrays for the multiclass model
+        self._tree_arrays: Optional[Tuple[np.ndarray, ...]] = None
+        
+        # Field accessors for feature_order, rebuilt if the order is replaced
+        self._extractors: Tuple = ()
+        self._extractor_order = None
         
         # Load models and metadata
         self._load_models()
         self._load_metadata()
+        self._cast_float32()
+        self._tree_arrays = _tree_arrays(self.multiclass_model)
+        self.feature_order = tuple(self.feature_order)
         
         logger.info("MATLAB model adapter initialized")
     
+    def _use_h5py(self, path: str) -> bool:
+        """Decide which reader to use for a .mat file."""
+        if self.loader == 'auto':
+            return H5PY_AVAILABLE and _is_hdf5_file(path)
+        return self.loader == 'h5py'
+    
+    @staticmethod
+    def _read_h5_strings(h5_file, dataset) -> List[str]:
+        """Read a MATLAB cell array of strings (object references to uint16 char arrays)."""
+        names = []
+        for ref in dataset[()].ravel():
+            chars = h5_file[ref][()].ravel()
+            names.append(''.join(map(chr, chars)))
+        return names
+    
+    def _load_models_hdf5(self):
+        """Load a MATLAB v7.3 (HDF5) binary model file with h5py."""
+        logger.info(f"Loading binary model (HDF5): {self.binary_model_path}")
+        
+        with h5py.File(self.binary_model_path, 'r') as f:
+            if 'model_data' not in f:
+                return
+            model_struct = f['model_data']
+            
+            if 'classifier' in model_struct:
+                # Same placeholder as the legacy loader until the MATLAB
+                # export format for the coefficients is settled
+                self.binary_model = LogisticRegression()
+            
+            # Each field is read as one contiguous array
+            if 'scaler_mu' in model_struct and 'scaler_sigma' in model_struct:
+                mu = model_struct['scaler_mu'][()].ravel()
+                sigma = model_struct['scaler_sigma'][()].ravel()
+                
+                self.scaler = StandardScaler()
+                self.scaler.mean_ = mu
+                self.scaler.scale_ = sigma
+                self.scaler.n_features_in_ = len(mu)
+            
+            if 'feature_names' in model_struct:
+                self.feature_order = self._read_h5_strings(f, model_struct['feature_names'])
+            
+            if 'class_names' in model_struct:
+                self.class_names = self._read_h5_strings(f, model_struct['class_names'])
+    
     def _load_models(self):
         """Load MATLAB .mat model files."""
         try:
+            if self._use_h5py(self.binary_model_path):
+                self._load_models_hdf5()
+                if self.multiclass_model_path:
+                    # Decision tree export format not handled yet (see below)
+                    logger.info(f"Multiclass model path set: {self.multiclass_model_path}")
+                return
+            
             # Load binary classifier
             logger.info(f"Loading binary model: {self.binary_model_path}")
             binary_data = scipy.io.loadmat(self.binary_model_path)
@@ -118,7 +315,20 @@ class MATLABModelAdapter:
             raise
     
     def _load_metadata(self):
-        """Load exported metadata files."""
+        """
+        Load exported metadata files.
+        
+        A single 'metadata_npz' bundle (see scripts/export_matlab_metadata.py)
+        is preferred; the individual JSON files are used otherwise.
+        """
+        npz_path = self.metadata_paths.get('metadata_npz')
+        if npz_path and Path(npz_path).exists():
+            try:
+                self._load_metadata_npz(npz_path)
+                return
+            except Exception as e:
+                logger.warning(f"Failed to load metadata bundle {npz_path}: {e}")
+        
         try:
             # Load feature order
             if 'feature_order' in self.metadata_paths:
@@ -146,25 +356,118 @@ class MATLABModelAdapter:
         except Exception as e:
             logger.warning(f"Failed to load some metadata: {e}")
     
+    def _load_metadata_npz(self, npz_path: str):
+        """Load feature order, scaler parameters and class names from one .npz file."""
+        with np.load(npz_path) as data:
+            if 'feature_order' in data:
+                self.feature_order = [str(name) for name in data['feature_order']]
+            
+            if 'mean' in data and 'scale' in data:
+                self.scaler = StandardScaler()
+                self.scaler.mean_ = data['mean']
+                self.scaler.scale_ = data['scale']
+                self.scaler.n_features_in_ = len(self.scaler.mean_)
+            
+            if 'classes' in data:
+                self.class_names = [str(name) for name in data['classes']]
+        
+        logger.info(f"Loaded metadata bundle: {len(self.feature_order)} features, {len(self.class_names)} classes")
+    
+    def _cast_float32(self):
+        """
+        Store scaler and linear model parameters as float32.
+        
+        The logistic score is compared against a threshold, so float32
+        precision is sufficient and halves the memory traffic per row.
+        """
+        if self.scaler is not None:
+            self.scaler.mean_ = np.asarray(self.scaler.mean_, dtype=np.float32)
+            self.scaler.scale_ = np.asarray(self.scaler.scale_, dtype=np.float32)
+        
+        if hasattr(self.binary_model, 'coef_'):
+            self.binary_model.coef_ = np.asarray(self.binary_model.coef_, dtype=np.float32)
+            self.binary_model.intercept_ = np.asarray(self.binary_model.intercept_, dtype=np.float32)
+    
+    def _multiclass_proba(self, X: np.ndarray) -> np.ndarray:
+        """Multiclass probabilities for prepared features."""
+        if self._tree_arrays is not None:
+            return _tree_predict_proba(X, *self._tree_arrays)
+        return self.multiclass_model.predict_proba(X)
+    
+    def _fill_features(self, feature_vector: FeatureVector, out: np.ndarray):
+        """Write features in model order into a preallocated (1, n_features) row."""
+        if self._extractor_order is not self.feature_order:
+            self._extractors = feature_extractors(tuple(self.feature_order))
+            self._extractor_order = self.feature_order
+        row = out[0]
+        for i, g in enumerate(self._extractors):
+            value = g(feature_vector)
+            row[i] = np.nan if value is None else value
+    
     def _prepare_features(self, feature_vector: FeatureVector) -> np.ndarray:
         """
         Prepare feature vector for model input.
         Applies same preprocessing as MATLAB training.
+        
+        The returned array is a reused buffer and is overwritten by the
+        next call; copy it if it has to outlive the prediction.
         """
-        # Convert to array in correct feature order
-        X = feature_vector.to_array(self.feature_order).reshape(1, -1)
+        n_features = len(self.feature_order)
+        if self._X_buf is None or self._X_buf.shape[1] != n_features:
+            self._X_buf = np.empty((1, n_features), dtype=np.float32)
+        X = self._X_buf
+        
+        # Fill in correct feature order
+        self._fill_features(feature_vector, X)
         
+        return self._scale_features(X)
+    
+    def _prepare_feature_matrix(self, feature_vectors: Sequence[FeatureVector]) -> np.ndarray:
+        """Prepare a (n_samples, n_features) model input for a batch of feature vectors."""
+        X = np.empty((len(feature_vectors), len(self.feature_order)), dtype=np.float32)
+        for i, feature_vector in enumerate(feature_vectors):
+            self._fill_features(feature_vector, X[i:i + 1])
+        return self._scale_features(X)
+    
+    def _scale_features(self, X: np.ndarray) -> np.ndarray:
+        """Apply missing-value handling and scaling to a filled feature matrix in place."""
         # Handle missing values (same as MATLAB)
-        X = np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0)
+        np.nan_to_num(X, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
         
-        # Apply scaling if available
+        # Apply scaling if available (same as StandardScaler.transform, in place)
         if self.scaler is not None:
-            X = self.scaler.transform(X)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                np.subtract(X, self.scaler.mean_, out=X)
+                np.divide(X, self.scaler.scale_, out=X)
             # Handle any remaining NaN values from scaling
-            X = np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0)
+            np.nan_to_num(X, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
         
         return X
     
+    def _decision_scores(self, X: np.ndarray) -> np.ndarray:
+        """Raw linear scores (logits) of the binary model for prepared features."""
+        if hasattr(self.binary_model, 'coef_'):
+            return X @ self.binary_model.coef_[0] + self.binary_model.intercept_[0]
+        return np.asarray(self.binary_model.decision_function(X)).reshape(-1)
+    
+    def predict_binary_label_only(self, X: np.ndarray) -> np.ndarray:
+        """
+        Thresholded binary decision without computing probabilities.
+        
+        Compares the linear score against the logit of the threshold, which
+        is equivalent to thresholding the sigmoid but needs no exp.
+        
+        Args:
+            X: Prepared (scaled) feature matrix of shape (n_samples, n_features)
+            
+        Returns:
+            Boolean array, True where the sample is classified as an attack
+        """
+        if self.binary_model is None:
+            raise RuntimeError("Binary model not loaded")
+        
+        return self._decision_scores(X) > self._logit_threshold
+    
     def predict_binary(self, feature_vector: FeatureVector) -> Tuple[bool, float]:
         """
         Binary classification prediction.
@@ -178,26 +481,16 @@ class MATLABModelAdapter:
         if self.binary_model is None:
             raise RuntimeError("Binary model not loaded")
         
-        start_time = time.time()
-        
         # Prepare features
         X = self._prepare_features(feature_vector)
         
-        # Get prediction probability
-        try:
-            proba = self.binary_model.predict_proba(X)[0, 1]  # Probability of attack class
-        except:
-            # Fallback if predict_proba not available
-            proba = float(self.binary_model.decision_function(X)[0])
-            # Convert decision function output to probability-like score
-            proba = 1.0 / (1.0 + np.exp(-proba))  # Sigmoid
-        
-        # Apply threshold
-        is_attack = proba > self.binary_threshold
+        # Threshold in score space; the probability is a scalar sigmoid of
+        # the same score (identical to predict_proba for logistic regression)
+        z = float(self._decision_scores(X)[0])
+        is_attack = z > self._logit_threshold
+        proba = 1.0 / (1.0 + math.exp(-z)) if z >= 0 else math.exp(z) / (1.0 + math.exp(z))
         
-        processing_time = (time.time() - start_time) * 1000  # Convert to ms
-        
-        return is_attack, float(proba)
+        return is_attack, proba
     
     def predict_multiclass(self, feature_vector: FeatureVector) -> Tuple[str, Dict[str, float]]:
         """
@@ -217,7 +510,7 @@ class MATLABModelAdapter:
         
         # Get predictions
         try:
-            probabilities = self.multiclass_model.predict_proba(X)[0]
+            probabilities = self._multiclass_proba(X)[0]
             predicted_class_idx = np.argmax(probabilities)
             
             # Map to class names
@@ -272,9 +565,69 @@ class MATLABModelAdapter:
             processing_time_ms=processing_time
         )
     
+    def predict_batch(self, feature_vectors: Sequence[FeatureVector]) -> List[ModelPrediction]:
+        """
+        Predict a batch of feature vectors with one model evaluation.
+        
+        Args:
+            feature_vectors: Input features
+            
+        Returns:
+            One ModelPrediction per input, in order
+        """
+        if self.binary_model is None:
+            raise RuntimeError("Binary model not loaded")
+        if not feature_vectors:
+            return []
+        
+        start_ns = time.perf_counter_ns()
+        
+        X = self._prepare_feature_matrix(feature_vectors)
+        z = self._decision_scores(X)
+        is_attack = z > self._logit_threshold
+        with np.errstate(over='ignore'):
+            probs = 1.0 / (1.0 + np.exp(-z.astype(np.float64)))
+        
+        # Multiclass only for the rows flagged as attacks
+        attack_classes: List[Optional[str]] = [None] * len(feature_vectors)
+        class_probabilities: List[Optional[Dict[str, float]]] = [None] * len(feature_vectors)
+        attack_rows = np.flatnonzero(is_attack)
+        if self.multiclass_model is not None and len(attack_rows):
+            try:
+                class_probs = self._multiclass_proba(X[attack_rows])
+                n_names = min(class_probs.shape[1], len(self.class_names))
+                for row, p in zip(attack_rows.tolist(), class_probs):
+                    attack_classes[row] = self.class_names[int(np.argmax(p))]
+                    class_probabilities[row] = dict(zip(self.class_names[:n_names], p[:n_names].tolist()))
+            except Exception as e:
+                logger.error(f"Multiclass prediction failed: {e}")
+                for row in attack_rows.tolist():
+                    attack_classes[row] = "Unknown"
+                    class_probabilities[row] = {"Unknown": 1.0}
+        
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e6 / len(feature_vectors)
+        
+        return [
+            ModelPrediction(
+                timestamp=fv.timestamp,
+                flow_key=fv.flow_key,
+                is_attack=bool(attack),
+                attack_probability=float(prob),
+                attack_class=attack_class,
+                class_probabilities=class_probs_i,
+                model_version="1.0",
+                threshold_used=self.binary_threshold,
+                processing_time_ms=processing_time
+            )
+            for fv, attack, prob, attack_class, class_probs_i in zip(
+                feature_vectors, is_attack.tolist(), probs.tolist(),
+                attack_classes, class_probabilities)
+        ]
+    
     def set_threshold(self, threshold: float):
         """Update binary classification threshold."""
         self.binary_threshold = max(0.0, min(1.0, threshold))
+        self._logit_threshold = _logit(self.binary_threshold)
         logger.info(f"Binary threshold updated to {self.binary_threshold}")
     
     def get_feature_importance(self) -> Optional[Dict[str, float]]:
@@ -299,11 +652,25 @@ class SimpleModelAdapter:
         """Initialize simple model adapter."""
         self.binary_threshold = 0.5  # Normal threshold
         self.class_names = ['Normal', 'DoS', 'Exploits', 'Fuzzers', 'Reconnaissance']
+        self._class_idx = {name: i for i, name in enumerate(self.class_names)}
+        self._default_probs = np.full(len(self.class_names), 0.05, dtype=np.float32)
         
-        # Track flow statistics for better detection
-        self.flow_stats = {}
+        # Track flow statistics for better detection: flow tuple -> row in
+        # parallel per-flow arrays (grown by doubling, compacted on cleanup)
+        self._flow_ids: Dict[Tuple[str, int, str, int], int] = {}
+        self._alloc_flow_arrays(FLOW_TABLE_INITIAL_SIZE)
         self.packet_count = 0
         
+        # Destination ports seen per source IP (port scan detection)
+        self._ports_by_src: Dict[str, Set[int]] = {}
+        
+        # (first_seen, flow_id) of flows created in the last 10 seconds
+        self._recent_flow_deque: deque = deque()
+        
+        # Latency is measured on every TIMING_SAMPLE_INTERVAL-th packet and
+        # reported as an exponential moving average in between
+        self._latency_ema_ms = 0.0
+        
         logger.info("Simple model adapter initialized")
     
     def predict(self, feature_vector: FeatureVector) -> ModelPrediction:
@@ -316,8 +683,18 @@ class SimpleModelAdapter:
         Returns:
             ModelPrediction based on realistic attack detection heuristics
         """
-        start_time = time.time()
+        return self._predict_scored(
+            feature_vector,
+            _packet_score(feature_vector.packet_size, feature_vector.payload_entropy,
+                          feature_vector.burstiness)
+        )
+    
+    def _predict_scored(self, feature_vector: FeatureVector, packet_score: float) -> ModelPrediction:
+        """Apply the stateful flow heuristics on top of a precomputed _packet_score."""
         self.packet_count += 1
+        sample_timing = self.packet_count % TIMING_SAMPLE_INTERVAL == 1
+        if sample_timing:
+            start_ns = time.perf_counter_ns()
         
         # Initialize attack score
         attack_score = 0.0
@@ -325,36 +702,27 @@ class SimpleModelAdapter:
         
         # Get flow key for tracking
         flow_key = feature_vector.flow_key
-        flow_id = f"{flow_key.src_ip}:{flow_key.src_port}->{flow_key.dst_ip}:{flow_key.dst_port}"
+        flow_id = (flow_key.src_ip, flow_key.src_port, flow_key.dst_ip, flow_key.dst_port)
         
         # Track flow statistics
-        if flow_id not in self.flow_stats:
-            self.flow_stats[flow_id] = {
-                'packet_count': 0,
-                'first_seen': feature_vector.timestamp,
-                'last_seen': feature_vector.timestamp,
-                'total_bytes': 0
-            }
-        
-        flow_stat = self.flow_stats[flow_id]
-        flow_stat['packet_count'] += 1
-        flow_stat['last_seen'] = feature_vector.timestamp
-        flow_stat['total_bytes'] += feature_vector.packet_size
+        idx = self._flow_ids.get(flow_id)
+        if idx is None:
+            idx = self._add_flow(flow_id, flow_key, feature_vector.timestamp)
+            self._ports_by_src.setdefault(flow_key.src_ip, set()).add(flow_key.dst_port)
+            self._recent_flow_deque.append((feature_vector.timestamp, flow_id))
+        
+        flow_packet_count = int(self._pkt_count[idx]) + 1
+        self._pkt_count[idx] = flow_packet_count
+        self._last_seen[idx] = feature_vector.timestamp
+        self._total_bytes[idx] += feature_vector.packet_size
         
         # Calculate flow duration and rate
-        flow_duration = max(0.1, flow_stat['last_seen'] - flow_stat['first_seen'])
-        flow_pps = flow_stat['packet_count'] / flow_duration
+        flow_duration = max(0.1, feature_vector.timestamp - float(self._first_seen[idx]))
+        flow_pps = flow_packet_count / flow_duration
         
         # === PORT SCAN DETECTION ===
         # Multiple connections to different ports from same source
-        src_flows = [f for f in self.flow_stats.keys() if f.startswith(f"{flow_key.src_ip}:")]
-        unique_dst_ports = set()
-        for f in src_flows:
-            try:
-                dst_port = int(f.split("->")[1].split(":")[1])
-                unique_dst_ports.add(dst_port)
-            except:
-                pass
+        unique_dst_ports = self._ports_by_src[flow_key.src_ip]
         
         if len(unique_dst_ports) > 5:  # Scanning multiple ports
             attack_score += 0.6
@@ -370,42 +738,20 @@ class SimpleModelAdapter:
                 attack_class = "DoS"
                 logger.debug(f"High rate detected: {flow_pps:.1f} pps to {flow_key.dst_ip}:{flow_key.dst_port}")
         
-        # === UNUSUAL PORT DETECTION ===
-        # Connections to uncommon ports
-        common_ports = {21, 22, 23, 25, 53, 80, 110, 143, 443, 993, 995, 3389}
-        if flow_key.dst_port not in common_ports:
-            attack_score += 0.2
-            if flow_key.dst_port > 1024:  # High port numbers
-                attack_score += 0.1
-        
-        # === PACKET SIZE ANOMALIES ===
-        # Very small or very large packets
-        if feature_vector.packet_size < 64:  # Tiny packets
-            attack_score += 0.2
-        elif feature_vector.packet_size > 1400:  # Large packets
-            attack_score += 0.2
+        # === FLOW-CONSTANT TERMS ===
+        # Unusual port, ICMP and baseline noise only depend on the flow key,
+        # so they are computed once when the flow is first seen
+        attack_score += float(self._static_score[idx])
         
-        # === PROTOCOL ANOMALIES ===
-        # ICMP traffic (often used in attacks)
-        if flow_key.protocol == "icmp":
-            attack_score += 0.3
-            attack_class = "DoS"  # ICMP floods
-        
-        # === PAYLOAD ANALYSIS ===
-        # High entropy suggests encrypted/compressed malicious payload
-        if hasattr(feature_vector, 'payload_entropy') and feature_vector.payload_entropy > 7.5:
-            attack_score += 0.3
-            attack_class = "Exploits"
-        
-        # === BURST DETECTION ===
-        # Sudden bursts of traffic
-        if hasattr(feature_vector, 'burstiness') and feature_vector.burstiness > 2.0:
-            attack_score += 0.2
+        # === PER-PACKET TERMS ===
+        # Size, entropy and burstiness anomalies (see _packet_score)
+        attack_score += float(packet_score)
         
         # === TIME-BASED PATTERNS ===
         # Multiple rapid connections (connection flooding)
-        recent_flows = [f for f, stats in self.flow_stats.items() 
-                       if (feature_vector.timestamp - stats['first_seen']) < 10.0]  # Last 10 seconds
+        recent_flows = self._recent_flow_deque
+        while recent_flows and feature_vector.timestamp - recent_flows[0][0] >= 10.0:  # Last 10 seconds
+            recent_flows.popleft()
         
         if len(recent_flows) > 20:  # Many flows in short time
             attack_score += 0.4
@@ -417,17 +763,10 @@ class SimpleModelAdapter:
             hasattr(feature_vector, 'tcp_flags') and 
             feature_vector.tcp_flags and 
             'S' in str(feature_vector.tcp_flags) and 
-            flow_stat['packet_count'] == 1):  # Only SYN, no response
+            flow_packet_count == 1):  # Only SYN, no response
             attack_score += 0.3
             attack_class = "DoS"
         
-        # === BASELINE NOISE ===
-        # Add some baseline variation to make it more realistic
-        # But make it deterministic based on flow characteristics
-        flow_hash = hash((flow_key.src_ip, flow_key.dst_ip, flow_key.src_port, flow_key.dst_port))
-        baseline_noise = (flow_hash % 100) / 1000.0  # 0.0 to 0.1
-        attack_score += baseline_noise
-        
         # === FINAL SCORING ===
         # Clamp to [0, 1]
         attack_prob = max(0.0, min(1.0, attack_score))
@@ -450,9 +789,10 @@ class SimpleModelAdapter:
                 attack_class = "Fuzzers"  # Changed from Generic to Fuzzers
             
             # Create realistic probabilities
-            class_probabilities = {name: 0.05 for name in self.class_names}
-            class_probabilities[attack_class] = max(0.6, attack_prob)
-            class_probabilities['Normal'] = 1.0 - attack_prob
+            probs = self._default_probs.copy()
+            probs[self._class_idx[attack_class]] = max(0.6, attack_prob)
+            probs[self._class_idx['Normal']] = 1.0 - attack_prob
+            class_probabilities = dict(zip(self.class_names, probs.tolist()))
             
             # Log detected attacks for debugging
             if attack_prob > 0.5:
@@ -461,7 +801,13 @@ class SimpleModelAdapter:
                           f"{flow_key.dst_ip}:{flow_key.dst_port} "
                           f"(rate: {flow_pps:.1f} pps, ports: {len(unique_dst_ports)})")
         
-        processing_time = (time.time() - start_time) * 1000
+        if sample_timing:
+            elapsed_ms = (time.perf_counter_ns() - start_ns) / 1e6
+            if self._latency_ema_ms == 0.0:
+                self._latency_ema_ms = elapsed_ms
+            else:
+                self._latency_ema_ms += LATENCY_EMA_ALPHA * (elapsed_ms - self._latency_ema_ms)
+        processing_time = self._latency_ema_ms
         
         # Clean up old flow stats periodically
         if self.packet_count % 1000 == 0:
@@ -479,22 +825,122 @@ class SimpleModelAdapter:
             processing_time_ms=processing_time
         )
     
+    def _flow_static_score(self, flow_key) -> float:
+        """Score terms that are constant for the lifetime of a flow."""
+        score = 0.0
+        
+        # === UNUSUAL PORT DETECTION ===
+        # Connections to uncommon ports
+        if flow_key.dst_port not in _COMMON_PORTS:
+            score += 0.2
+            if flow_key.dst_port > 1024:  # High port numbers
+                score += 0.1
+        
+        # === PROTOCOL ANOMALIES ===
+        # ICMP traffic (often used in attacks)
+        if flow_key.protocol == "icmp":
+            score += 0.3
+        
+        # === BASELINE NOISE ===
+        # Add some baseline variation to make it more realistic
+        # But make it deterministic based on flow characteristics
+        flow_hash = _splitmix64(
+            (flow_key.src_ip_int * 0x9E3779B97F4A7C15 + flow_key.dst_ip_int)
+            ^ (flow_key.src_port << 16) ^ flow_key.dst_port
+        )
+        score += (flow_hash & 0x3FF) / 10240.0  # 0.0 to 0.1
+        
+        return score
+    
+    def predict_batch(self, feature_vectors: Sequence[FeatureVector]) -> List[ModelPrediction]:
+        """
+        Predict a batch of feature vectors.
+        
+        The per-packet score terms are computed for the whole batch at once;
+        flow tracking is order-dependent, so the flow heuristics are then
+        applied to the vectors in order.
+        
+        Args:
+            feature_vectors: Input features
+            
+        Returns:
+            One ModelPrediction per input, in order
+        """
+        n = len(feature_vectors)
+        packet_scores = _packet_score(
+            np.fromiter((fv.packet_size for fv in feature_vectors), dtype=np.float64, count=n),
+            np.fromiter((fv.payload_entropy for fv in feature_vectors), dtype=np.float64, count=n),
+            np.fromiter((fv.burstiness for fv in feature_vectors), dtype=np.float64, count=n)
+        )
+        predict_scored = self._predict_scored
+        return [predict_scored(fv, score) for fv, score in zip(feature_vectors, packet_scores.tolist())]
+    
     def _cleanup_old_flows(self, current_time: float):
         """Clean up old flow statistics to prevent memory bloat."""
         cutoff_time = current_time - 300.0  # Keep last 5 minutes
-        old_flows = [flow_id for flow_id, stats in self.flow_stats.items() 
-                    if stats['last_seen'] < cutoff_time]
-        
-        for flow_id in old_flows:
-            del self.flow_stats[flow_id]
-        
-        if old_flows:
-            logger.debug(f"Cleaned up {len(old_flows)} old flows")
+        n = len(self._flow_ids)
+        keep = self._last_seen[:n] >= cutoff_time
+        n_old = n - int(np.count_nonzero(keep))
+        
+        if n_old:
+            # Compact the surviving rows to the front, preserving their order
+            flow_ids = list(self._flow_ids)
+            for arr in (self._pkt_count, self._first_seen, self._last_seen,
+                        self._total_bytes, self._static_score):
+                survivors = arr[:n][keep]
+                arr[:len(survivors)] = survivors
+            self._flow_ids = {flow_id: i for i, flow_id in
+                              enumerate(f for f, k in zip(flow_ids, keep) if k)}
+            self._rebuild_port_index()
+            logger.debug(f"Cleaned up {n_old} old flows")
+    
+    def _alloc_flow_arrays(self, capacity: int):
+        """Allocate empty per-flow arrays with the given capacity."""
+        self._pkt_count = np.zeros(capacity, dtype=np.int64)
+        self._first_seen = np.zeros(capacity, dtype=np.float64)
+        self._last_seen = np.zeros(capacity, dtype=np.float64)
+        self._total_bytes = np.zeros(capacity, dtype=np.float64)
+        self._static_score = np.zeros(capacity, dtype=np.float64)
+    
+    def _add_flow(self, flow_id: Tuple[str, int, str, int], flow_key: FlowKey, timestamp: float) -> int:
+        """Assign the next row to a new flow, growing the arrays if full."""
+        idx = len(self._flow_ids)
+        if idx == len(self._pkt_count):
+            old = (self._pkt_count, self._first_seen, self._last_seen,
+                   self._total_bytes, self._static_score)
+            self._alloc_flow_arrays(2 * idx)
+            for new_arr, old_arr in zip((self._pkt_count, self._first_seen, self._last_seen,
+                                         self._total_bytes, self._static_score), old):
+                new_arr[:idx] = old_arr
+        
+        self._flow_ids[flow_id] = idx
+        self._pkt_count[idx] = 0
+        self._first_seen[idx] = timestamp
+        self._last_seen[idx] = timestamp
+        self._total_bytes[idx] = 0.0
+        self._static_score[idx] = self._flow_static_score(flow_key)
+        return idx
+    
+    def _rebuild_port_index(self):
+        """Rebuild the per-source destination port index from tracked flows."""
+        self._ports_by_src = {}
+        for src_ip, _, _, dst_port in self._flow_ids:
+            self._ports_by_src.setdefault(src_ip, set()).add(dst_port)
     
     def set_threshold(self, threshold: float):
         """Update binary classification threshold."""
         self.binary_threshold = max(0.0, min(1.0, threshold))
         logger.info(f"Enhanced model threshold updated to {self.binary_threshold}")
+    
+    def reset(self):
+        """Reset all flow tracking state (useful for testing)."""
+        self._flow_ids = {}
+        self._alloc_flow_arrays(FLOW_TABLE_INITIAL_SIZE)
+        self.packet_count = 0
+        self._ports_by_src = {}
+        self._recent_flow_deque.clear()
+        self._latency_ema_ms = 0.0
+        logger.info("Simple model adapter state reset")
 
 # Use SimpleModelAdapter as default for now
 # ModelAdapter = MATLABModelAdapter  # Uncomment when MATLAB loading is fixed
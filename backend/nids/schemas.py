@@ -2,13 +2,46 @@
 Type definitions and data schemas for the NIDS pipeline.
 """
 
-from typing import Dict, List, Optional, Union, Any
-from pydantic import BaseModel, Field
+import socket
+import ipaddress
+import sys
+import zlib
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from operator import attrgetter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union, Any
+from pydantic import BaseModel
 from datetime import datetime
 import numpy as np
 
 
-class PacketInfo(BaseModel):
+@lru_cache(maxsize=65536)
+def ip_to_int(ip: str) -> int:
+    """
+    Convert an IP address string to an integer.
+    
+    IPv4 maps to 32 bits and IPv6 to 128 bits. Anything that is not a
+    valid address (e.g. a hostname) falls back to a CRC32 of the string
+    so the result is still deterministic across runs.
+    """
+    try:
+        return int.from_bytes(socket.inet_aton(ip), 'big')
+    except OSError:
+        pass
+    try:
+        return int(ipaddress.ip_address(ip))
+    except ValueError:
+        return zlib.crc32(ip.encode('utf-8'))
+
+
+# Per-packet types are plain dataclasses: they are built on every packet and
+# come from trusted code (capture/feature extraction), so pydantic
+# validation is only kept for the less frequent API-facing models below.
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
+class PacketInfo:
     """Raw packet information from capture layer."""
     timestamp: float
     src_ip: str
@@ -29,11 +62,15 @@ class PacketInfo(BaseModel):
     # IP-specific fields
     ttl: Optional[int] = None
     ip_flags: Optional[int] = None
-    
-    model_config = {"arbitrary_types_allowed": True}
 
 
-class FlowKey(BaseModel):
+class _FlowKeyCache:
+    """Derived FlowKey values, kept out of the dataclass fields so they are not serialized."""
+    __slots__ = ('_hash', '_src_ip_int', '_dst_ip_int')
+
+
+@dataclass(frozen=True, **_SLOTS)
+class FlowKey(_FlowKeyCache):
     """5-tuple flow identifier."""
     src_ip: str
     dst_ip: str
@@ -41,14 +78,33 @@ class FlowKey(BaseModel):
     dst_port: int
     protocol: str
     
+    # Hash is computed once, over the integer addresses; flow keys are used
+    # as dict keys on every packet. The integers always come from the address
+    # strings (ip_to_int is cached), so keys that compare equal hash equal
+    def __post_init__(self) -> None:
+        src_ip_int = ip_to_int(self.src_ip)
+        dst_ip_int = ip_to_int(self.dst_ip)
+        object.__setattr__(self, '_src_ip_int', src_ip_int)
+        object.__setattr__(self, '_dst_ip_int', dst_ip_int)
+        object.__setattr__(self, '_hash', hash((src_ip_int, dst_ip_int, self.src_port,
+                                                self.dst_port, self.protocol)))
+    
+    @property
+    def src_ip_int(self) -> int:
+        """Source IP as an integer."""
+        return self._src_ip_int
+    
+    @property
+    def dst_ip_int(self) -> int:
+        """Destination IP as an integer."""
+        return self._dst_ip_int
+    
     def __hash__(self):
-        return hash((self.src_ip, self.dst_ip, self.src_port, self.dst_port, self.protocol))
+        return self._hash
     
-    def __eq__(self, other):
-        if not isinstance(other, FlowKey):
-            return False
-        return (self.src_ip, self.dst_ip, self.src_port, self.dst_port, self.protocol) == \
-               (other.src_ip, other.dst_ip, other.src_port, other.dst_port, other.protocol)
+    def __reduce__(self):
+        # Rebuild through __init__ so the cached values are recomputed
+        return (self.__class__, (self.src_ip, self.dst_ip, self.src_port, self.dst_port, self.protocol))
 
 
 class FlowState(BaseModel):
@@ -70,17 +126,23 @@ class FlowState(BaseModel):
     fin_count: int = 0
     rst_count: int = 0
     
-    # Timing statistics
-    inter_arrival_times: List[float] = Field(default_factory=list)
-    packet_sizes: List[int] = Field(default_factory=list)
+    # Sliding window ring buffers of the last window_size packet sizes and
+    # inter-arrival times; packet i of the flow is written at i % window_size
+    packet_sizes: np.ndarray
+    inter_arrival_times: np.ndarray
     
-    # Window tracking for sliding features
-    recent_packets: List[PacketInfo] = Field(default_factory=list)
+    # Exact running sums and sums of squares over the two ring buffers, as
+    # Python ints (sizes in bytes, inter-arrival times in nanoseconds)
+    size_sum: int = 0
+    size_sq_sum: int = 0
+    iat_sum: int = 0
+    iat_sq_sum: int = 0
     
     model_config = {"arbitrary_types_allowed": True}
 
 
-class FeatureVector(BaseModel):
+@dataclass(**_SLOTS)
+class FeatureVector:
     """Extracted features for model input."""
     timestamp: float
     flow_key: FlowKey
@@ -112,12 +174,28 @@ class FeatureVector(BaseModel):
     dns_qname_length: Optional[float] = None
     tls_sni_present: Optional[bool] = None
     
-    def to_array(self, feature_order: List[str]) -> np.ndarray:
+    def to_array(self, feature_order: Sequence[str], dtype=np.float64) -> np.ndarray:
         """Convert to numpy array in specified feature order."""
-        feature_dict = self.model_dump()
-        return np.array([feature_dict.get(name, 0.0) for name in feature_order])
+        return np.array([g(self) for g in feature_extractors(tuple(feature_order))], dtype=dtype)
+
+
+_FEATURE_FIELDS = frozenset(f.name for f in fields(FeatureVector))
+
+
+def _missing_feature(feature_vector: FeatureVector) -> float:
+    return 0.0
+
+
+@lru_cache(maxsize=32)
+def feature_extractors(feature_order: Sequence[str]) -> Tuple[Callable[[FeatureVector], Any], ...]:
+    """
+    Build per-feature accessors for a FeatureVector in the given order.
     
-    model_config = {"arbitrary_types_allowed": True}
+    Names that are not FeatureVector fields read as 0.0. The result is
+    cached, so pass feature_order as a tuple when calling repeatedly.
+    """
+    return tuple(attrgetter(name) if name in _FEATURE_FIELDS else _missing_feature
+                 for name in feature_order)
 
 
 class ModelPrediction(BaseModel):
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Build an on-disk synthetic packet corpus for repeatable demo replays.
+
+Packets are drawn with the demo's PacketBatchGenerator and written as one
+.npy file of CORPUS_DTYPE records, which `demo.py --corpus` memory-maps.
+"""
+
+import argparse
+from pathlib import Path
+import sys
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+
+from demo import CORPUS_DTYPE, PacketBatchGenerator
+
+
+def build_corpus(output_file: str, num_packets: int, batch: int = 4096, seed: int = 0) -> Path:
+    """
+    Generate a packet corpus file.
+    
+    Args:
+        output_file: Destination .npy path
+        num_packets: Number of packets to generate
+        batch: Packets generated per step
+        seed: RNG seed, so the same corpus can be rebuilt
+        
+    Returns:
+        Path of the written corpus
+    """
+    output_path = Path(output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    corpus = np.lib.format.open_memmap(output_path, mode='w+', dtype=CORPUS_DTYPE,
+                                       shape=(num_packets,))
+    generator = PacketBatchGenerator(batch=batch, seed=seed)
+    
+    for offset in range(0, num_packets, batch):
+        records = generator.next_batch().records()
+        count = min(batch, num_packets - offset)
+        corpus[offset:offset + count] = records[:count]
+    
+    corpus.flush()
+    del corpus
+    
+    logger.info(f"Packet corpus saved: {output_path} ({num_packets} packets)")
+    return output_path
+
+
+def main():
+    """Main corpus build function."""
+    parser = argparse.ArgumentParser(description="Build a synthetic packet corpus")
+    parser.add_argument("--output", default="data/packet_corpus.npy", help="Output .npy file")
+    parser.add_argument("--packets", type=int, default=10_000_000, help="Number of packets")
+    parser.add_argument("--batch", type=int, default=4096, help="Packets generated per step")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed")
+    
+    args = parser.parse_args()
+    
+    build_corpus(args.output, args.packets, args.batch, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -5,11 +5,15 @@ Generates synthetic traffic and demonstrates the complete pipeline.
 """
 
 import time
-import random
+import asyncio
 import argparse
 from pathlib import Path
+from enum import IntEnum
+from typing import Optional
 import sys
 
+import numpy as np
+
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -17,94 +21,179 @@ from nids import RealTimeNIDS
 from nids.schemas import PacketInfo
 from loguru import logger
 
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+
+# Synthetic payloads, shared by every generated packet
+_NORMAL_PAYLOAD = b"GET / HTTP/1.1\r\nHost: example.com\r\n\r\n"
+_EXPLOIT_PAYLOAD = b"\x90" * 100 + b"\x31\xc0\x50\x68"  # NOP sled + shellcode
+_EMPTY = b""
+
+# Client addresses only vary in the last octet; indexed by src_oct in
+# PacketBatchGenerator and the demo_fast replay
+CLIENT_IPS = tuple(f"192.168.1.{i}" for i in range(256))
+_DST_PORTS = (80, 443)
+
+# Maximum feature vectors scored per predict_batch call in the demo loop
+PREDICT_BATCH_SIZE = 128
+
+
+class TrafficType(IntEnum):
+    """Traffic type codes used by the batched generator (column index for np.choose)."""
+    NORMAL = 0
+    DOS = 1
+    EXPLOIT = 2
+    RECON = 3
+
+
+# Synthetic traffic mix: 80% normal, 10% DoS, 5% exploits, 5% recon
+TRAFFIC_CUM_WEIGHTS = np.array([0.80, 0.90, 0.95, 1.00])
+
+# On-disk packet corpus record (see scripts/build_corpus.py); one field per
+# PacketBatchGenerator column
+CORPUS_DTYPE = np.dtype([
+    ('attack_type', np.uint8),
+    ('src_oct', np.uint8),
+    ('src_port', np.uint16),
+    ('dst_port', np.uint16),
+    ('size', np.uint16),
+    ('payload_size', np.uint16),
+    ('flags', np.uint8),
+    ('window', np.uint16),
+])
+
+# Pacing: only sleep when the next deadline is further away than this, and
+# wake up this early to busy-wait the remainder (sleep granularity is ~1 ms)
+PACING_SLEEP_THRESHOLD_NS = 2_000_000
+PACING_SPIN_NS = 1_500_000
 
-def generate_synthetic_packet(attack_type: str = "normal") -> PacketInfo:
-    """Generate synthetic network packet for demonstration."""
+
+class PacketBatchGenerator:
+    """
+    Synthetic packet source that draws packet fields in batches.
     
-    base_time = time.time()
+    Random fields for `batch` packets are generated at once with NumPy and
+    resolved per traffic type into one array per PacketInfo field
+    (src_oct, src_port, dst_port, size, payload_size, flags, window);
+    PacketInfo objects are only built as packets are taken. Traffic mix is
+    TRAFFIC_CUM_WEIGHTS: 80% normal, 10% DoS, 5% exploits, 5% recon.
+    """
     
-    if attack_type == "normal":
-        # Normal web traffic
-        return PacketInfo(
-            timestamp=base_time,
-            src_ip=f"192.168.1.{random.randint(10, 50)}",
-            dst_ip="10.0.0.100",
-            src_port=random.randint(1024, 65535),
-            dst_port=random.choice([80, 443]),
-            protocol="tcp",
-            packet_size=random.randint(64, 1500),
-            payload_size=random.randint(0, 1400),
-            payload=b"GET / HTTP/1.1\\r\\nHost: example.com\\r\\n\\r\\n",
-            tcp_flags=0x18,  # PSH+ACK
-            tcp_window=65535,
-            ttl=64
-        )
+    # Payload per traffic type, indexed by TrafficType
+    PAYLOADS = (_NORMAL_PAYLOAD, _EMPTY, _EXPLOIT_PAYLOAD, _EMPTY)
     
-    elif attack_type == "dos":
-        # DoS attack - high packet rate, small packets
-        return PacketInfo(
-            timestamp=base_time,
-            src_ip=f"192.168.1.{random.randint(200, 254)}",
-            dst_ip="10.0.0.100",
-            src_port=random.randint(1024, 65535),
-            dst_port=80,
-            protocol="tcp",
-            packet_size=64,  # Small packets
-            payload_size=0,
-            payload=b"",
-            tcp_flags=0x02,  # SYN
-            tcp_window=1024,
-            ttl=64
-        )
+    def __init__(self, batch: int = 4096, seed: Optional[int] = None):
+        self.batch = batch
+        self.rng = np.random.default_rng(seed)
+        self._pos = batch  # forces a refill on first use
     
-    elif attack_type == "exploit":
-        # Exploit attempt - suspicious payload
-        suspicious_payload = b"\\x90" * 100 + b"\\x31\\xc0\\x50\\x68"  # NOP sled + shellcode
-        return PacketInfo(
-            timestamp=base_time,
-            src_ip=f"192.168.1.{random.randint(100, 150)}",
-            dst_ip="10.0.0.100",
-            src_port=random.randint(1024, 65535),
-            dst_port=443,
-            protocol="tcp",
-            packet_size=len(suspicious_payload) + 40,  # +headers
-            payload_size=len(suspicious_payload),
-            payload=suspicious_payload,
-            tcp_flags=0x18,  # PSH+ACK
-            tcp_window=32768,
-            ttl=64
-        )
+    def _refill(self):
+        """Draw the random fields for the next batch of packets."""
+        rng, n = self.rng, self.batch
+        # Inverse-CDF sampling of the traffic type against the fixed CDF
+        kind = np.searchsorted(TRAFFIC_CUM_WEIGHTS, rng.random(n), side='right')
+        exploit_len = len(_EXPLOIT_PAYLOAD)
+        
+        # Candidate values are drawn for every row; np.choose keeps the one
+        # matching each row's TrafficType (NORMAL, DOS, EXPLOIT, RECON)
+        self.attack_type = kind
+        self.src_oct = np.choose(kind, (rng.integers(10, 51, n), rng.integers(200, 255, n),
+                                        rng.integers(100, 151, n), rng.integers(150, 201, n)))
+        self.src_port = rng.integers(1024, 65536, n)
+        self.dst_port = np.choose(kind, (rng.choice(_DST_PORTS, size=n), 80, 443,
+                                         rng.integers(1, 1025, n)))
+        self.size = np.choose(kind, (rng.integers(64, 1501, n), 64, exploit_len + 40, 64))
+        self.payload_size = np.choose(kind, (rng.integers(0, 1401, n), 0, exploit_len, 0))
+        self.flags = np.choose(kind, (0x18, 0x02, 0x18, 0x02))  # PSH+ACK / SYN
+        self.window = np.choose(kind, (65535, 1024, 32768, 1024))
+        self._pos = 0
+    
+    def __iter__(self):
+        return self
     
-    elif attack_type == "recon":
-        # Reconnaissance - port scanning
+    def __next__(self) -> PacketInfo:
+        if self._pos >= self.batch:
+            self._refill()
+        i = self._pos
+        self._pos += 1
+        
         return PacketInfo(
-            timestamp=base_time,
-            src_ip=f"192.168.1.{random.randint(150, 200)}",
+            timestamp=time.time(),
+            src_ip=CLIENT_IPS[self.src_oct[i]],
             dst_ip="10.0.0.100",
-            src_port=random.randint(1024, 65535),
-            dst_port=random.randint(1, 1024),  # Scanning low ports
+            src_port=int(self.src_port[i]),
+            dst_port=int(self.dst_port[i]),
             protocol="tcp",
-            packet_size=64,
-            payload_size=0,
-            payload=b"",
-            tcp_flags=0x02,  # SYN
-            tcp_window=1024,
+            packet_size=int(self.size[i]),
+            payload_size=int(self.payload_size[i]),
+            payload=self.PAYLOADS[self.attack_type[i]],
+            tcp_flags=int(self.flags[i]),
+            tcp_window=int(self.window[i]),
             ttl=64
         )
     
-    else:
-        # Default to normal
-        return generate_synthetic_packet("normal")
+    def next_batch(self):
+        """Draw a fresh batch and return it without building PacketInfo objects."""
+        self._refill()
+        self._pos = self.batch
+        return self
+    
+    def records(self) -> np.ndarray:
+        """Current batch as a CORPUS_DTYPE structured array."""
+        out = np.empty(len(self.attack_type), dtype=CORPUS_DTYPE)
+        for name in CORPUS_DTYPE.names:
+            out[name] = getattr(self, name)
+        return out
 
 
-def run_synthetic_demo(nids: RealTimeNIDS, duration: int = 60, packets_per_second: int = 100):
+class CorpusPacketSource(PacketBatchGenerator):
+    """
+    Replays a prebuilt packet corpus (.npy of CORPUS_DTYPE) from a memory map.
+    
+    Batches are consecutive slices of the file, wrapping around at the end,
+    so no random numbers are drawn while replaying.
+    """
+    
+    def __init__(self, path: str, batch: int = 4096):
+        self._corpus = np.load(path, mmap_mode='r')
+        if self._corpus.dtype != CORPUS_DTYPE:
+            raise ValueError(f"{path} is not a packet corpus (dtype {self._corpus.dtype})")
+        if len(self._corpus) == 0:
+            raise ValueError(f"{path} is an empty packet corpus")
+        self._offset = 0
+        super().__init__(batch=min(batch, len(self._corpus)))
+    
+    def _refill(self):
+        """Map the next slice of the corpus."""
+        if self._offset + self.batch > len(self._corpus):
+            self._offset = 0
+        chunk = self._corpus[self._offset:self._offset + self.batch]
+        self._offset += self.batch
+        
+        for name in CORPUS_DTYPE.names:
+            setattr(self, name, chunk[name])
+        self._pos = 0
+
+
+def run_synthetic_demo(nids: RealTimeNIDS, duration: int = 60, packets_per_second: int = 100,
+                       predict_batch_size: int = PREDICT_BATCH_SIZE,
+                       packets: Optional[PacketBatchGenerator] = None):
     """
     Run synthetic traffic demo.
     
+    Feature vectors are scored with predict_batch once predict_batch_size
+    of them are pending, or earlier when the pacer is about to sleep.
+    
     Args:
         nids: NIDS instance
         duration: Demo duration in seconds
         packets_per_second: Packet generation rate
+        predict_batch_size: Maximum feature vectors per predict_batch call
+        packets: Packet source (default: a new PacketBatchGenerator)
     """
     logger.info(f"Starting synthetic demo: {duration}s duration, {packets_per_second} pps")
     
@@ -112,28 +201,38 @@ def run_synthetic_demo(nids: RealTimeNIDS, duration: int = 60, packets_per_secon
     packet_count = 0
     
     # Traffic mix: 80% normal, 10% DoS, 5% exploits, 5% recon
-    traffic_types = (
-        ["normal"] * 80 + 
-        ["dos"] * 10 + 
-        ["exploit"] * 5 + 
-        ["recon"] * 5
-    )
+    if packets is None:
+        packets = PacketBatchGenerator()
+    
+    # Deadline-based pacing: sleep for most of a long gap, spin the tail
+    interval_ns = 1_000_000_000 // packets_per_second
+    next_deadline = time.perf_counter_ns()
+    
+    # Bind the per-packet calls once
+    extract = nids.feature_extractor.extract_features
+    predict_batch = nids.model_adapter.predict_batch
+    gen_alert = nids.alert_manager.generate_alert
+    warn = logger.warning
+    pending_features = []
+    
+    def flush():
+        for prediction in predict_batch(pending_features):
+            # Generate alert if needed
+            if prediction.is_attack:
+                alert = gen_alert(prediction)
+                if alert:
+                    warn("ALERT: {}", alert.description)
+        pending_features.clear()
     
     try:
         while time.time() - start_time < duration:
             # Generate packet
-            attack_type = random.choice(traffic_types)
-            packet = generate_synthetic_packet(attack_type)
+            packet = next(packets)
             
             # Process through NIDS pipeline
-            features = nids.feature_extractor.extract_features(packet)
-            prediction = nids.model_adapter.predict(features)
-            
-            # Generate alert if needed
-            if prediction.is_attack:
-                alert = nids.alert_manager.generate_alert(prediction)
-                if alert:
-                    logger.warning(f"ALERT: {alert.description}")
+            pending_features.append(extract(packet))
+            if len(pending_features) >= predict_batch_size:
+                flush()
             
             packet_count += 1
             
@@ -141,13 +240,31 @@ def run_synthetic_demo(nids: RealTimeNIDS, duration: int = 60, packets_per_secon
             if packet_count % 1000 == 0:
                 elapsed = time.time() - start_time
                 current_pps = packet_count / elapsed
-                logger.info(f"Processed {packet_count} packets ({current_pps:.1f} pps)")
+                logger.info("Processed {} packets ({:.1f} pps)", packet_count, current_pps)
             
             # Rate limiting
-            time.sleep(1.0 / packets_per_second)
+            next_deadline += interval_ns
+            now = time.perf_counter_ns()
+            if packet_count % 1000 == 0:
+                # Don't try to catch up on budget lost to slow iterations
+                next_deadline = max(next_deadline, now)
+            gap = next_deadline - now
+            if gap > PACING_SLEEP_THRESHOLD_NS:
+                # Idle time ahead: score what is pending instead of waiting
+                if pending_features:
+                    flush()
+                    gap = next_deadline - time.perf_counter_ns()
+                if gap > PACING_SLEEP_THRESHOLD_NS:
+                    time.sleep((gap - PACING_SPIN_NS) / 1e9)
+            while time.perf_counter_ns() < next_deadline:
+                pass
+        
+        flush()
     
     except KeyboardInterrupt:
         logger.info("Demo interrupted by user")
+        # Score the packets extracted before the interrupt
+        flush()
     
     # Final statistics
     elapsed = time.time() - start_time
@@ -160,6 +277,110 @@ def run_synthetic_demo(nids: RealTimeNIDS, duration: int = 60, packets_per_secon
     logger.info(f"Final status: {status}")
 
 
+async def run_synthetic_demo_async(nids: RealTimeNIDS, duration: int = 60,
+                                   packets_per_second: int = 100, queue_size: int = 1024,
+                                   packets: Optional[PacketBatchGenerator] = None):
+    """
+    Run synthetic traffic demo as an asyncio producer/consumer pair.
+    
+    The producer paces packets onto a bounded queue with loop timers; the
+    consumer runs them through the NIDS pipeline. Both share one thread,
+    so this decouples pacing from processing rather than parallelizing it.
+    
+    Args:
+        nids: NIDS instance
+        duration: Demo duration in seconds
+        packets_per_second: Packet generation rate
+        queue_size: Maximum packets waiting for processing
+        packets: Packet source (default: a new PacketBatchGenerator)
+    """
+    logger.info(f"Starting async synthetic demo: {duration}s duration, {packets_per_second} pps")
+    
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    if packets is None:
+        packets = PacketBatchGenerator()
+    interval = 1.0 / packets_per_second
+    start_time = loop.time()
+    end_time = start_time + duration
+    packet_count = 0
+    
+    extract = nids.feature_extractor.extract_features
+    predict = nids.model_adapter.predict
+    gen_alert = nids.alert_manager.generate_alert
+    warn = logger.warning
+    
+    async def produce():
+        next_t = loop.time()
+        while loop.time() < end_time:
+            await queue.put(next(packets))
+            next_t += interval
+            await asyncio.sleep(max(0.0, next_t - loop.time()))
+    
+    async def consume():
+        nonlocal packet_count
+        while True:
+            packet = await queue.get()
+            try:
+                prediction = predict(extract(packet))
+                if prediction.is_attack:
+                    alert = gen_alert(prediction)
+                    if alert:
+                        warn("ALERT: {}", alert.description)
+                
+                packet_count += 1
+                if packet_count % 1000 == 0:
+                    current_pps = packet_count / (loop.time() - start_time)
+                    logger.info("Processed {} packets ({:.1f} pps)", packet_count, current_pps)
+            finally:
+                queue.task_done()
+    
+    async def run():
+        await produce()
+        await queue.join()
+    
+    # consume() only returns by raising, so whichever task ends first ends
+    # the demo; a consumer error is re-raised here instead of leaving the
+    # producer blocked on a full queue
+    consumer = asyncio.create_task(consume())
+    pipeline = asyncio.create_task(run())
+    try:
+        done, _ = await asyncio.wait((pipeline, consumer), return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    finally:
+        pipeline.cancel()
+        consumer.cancel()
+    
+    elapsed = loop.time() - start_time
+    logger.info(f"Demo complete: {packet_count} packets in {elapsed:.1f}s ({packet_count / elapsed:.1f} pps)")
+    
+    status = nids.get_status()
+    logger.info(f"Final status: {status}")
+
+
+def run_async_demo(nids: RealTimeNIDS, duration: int = 60, packets_per_second: int = 100,
+                   packets: Optional[PacketBatchGenerator] = None):
+    """Run run_synthetic_demo_async on uvloop when installed, else the default loop."""
+    if UVLOOP_AVAILABLE:
+        uvloop.install()
+    try:
+        asyncio.run(run_synthetic_demo_async(nids, duration, packets_per_second, packets=packets))
+    except KeyboardInterrupt:
+        logger.info("Demo interrupted by user")
+
+
+def configure_logging(level: str = "INFO"):
+    """
+    Log to stderr through loguru's background queue.
+    
+    With enqueue=True records are written by a worker thread, so a slow
+    console does not stall the packet loop.
+    """
+    logger.remove()
+    logger.add(sys.stderr, level=level, enqueue=True)
+
+
 def main():
     """Main demo function."""
     parser = argparse.ArgumentParser(description="NIDS Demo Script")
@@ -168,8 +389,13 @@ def main():
     parser.add_argument("--pps", type=int, default=100, help="Packets per second")
     parser.add_argument("--mode", choices=["synthetic", "live"], default="synthetic", 
                        help="Demo mode: synthetic traffic or live capture")
+    parser.add_argument("--async-loop", action="store_true",
+                       help="Run the synthetic demo as an asyncio producer/consumer (uvloop if installed)")
+    parser.add_argument("--corpus", default=None,
+                       help="Replay a packet corpus built by scripts/build_corpus.py instead of generating traffic")
     
     args = parser.parse_args()
+    configure_logging()
     
     # Initialize NIDS
     logger.info("Initializing NIDS...")
@@ -178,7 +404,11 @@ def main():
     try:
         if args.mode == "synthetic":
             # Run synthetic traffic demo
-            run_synthetic_demo(nids, args.duration, args.pps)
+            packets = CorpusPacketSource(args.corpus) if args.corpus else None
+            if args.async_loop:
+                run_async_demo(nids, args.duration, args.pps, packets=packets)
+            else:
+                run_synthetic_demo(nids, args.duration, args.pps, packets=packets)
         
         elif args.mode == "live":
             # Run live capture demo
@@ -199,6 +429,7 @@ def main():
         return 1
     
     logger.info("Demo completed successfully!")
+    logger.complete()
     return 0
 
 
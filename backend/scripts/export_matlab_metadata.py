@@ -21,9 +21,166 @@ except ImportError:
     print("ERROR: scipy not available. Run: pip install scipy")
     sys.exit(1)
 
+try:
+    import h5py
+    H5PY_AVAILABLE = True
+except ImportError:
+    H5PY_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from loguru import logger
 
 
+# Sample feature order (based on your MATLAB code)
+FEATURE_ORDER = (
+    'packet_size', 'direction', 'inter_arrival_delta', 'tcp_flags_bitmap', 'ttl',
+    'total_bytes', 'total_packets', 'bytes_ratio', 'packets_per_second', 'syn_fin_ratio',
+    'size_mean', 'size_std', 'iat_mean', 'iat_std', 'burstiness',
+    'payload_entropy', 'printable_ratio'
+)
+
+# Sample scaler parameters (identity scaling)
+SAMPLE_SCALER = {
+    'mean': [0.0] * len(FEATURE_ORDER),
+    'scale': [1.0] * len(FEATURE_ORDER),
+    'n_features': len(FEATURE_ORDER)
+}
+
+# Sample class encoder
+SAMPLE_CLASSES = {
+    'classes': ['Normal', 'DoS', 'Exploits', 'Fuzzers', 'Generic', 'Reconnaissance'],
+    'n_classes': 6
+}
+
+
+def _json_default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj) -> bytes:
+    """Serialize metadata as indented JSON (numpy arrays serialized directly)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, indent=2, default=_json_default).encode('utf-8')
+
+
+def _as_float_vector(values) -> np.ndarray:
+    """
+    View scaler values as a 1-D native float64 array.
+    
+    The array is serialized as is (see _dumps), so it must be contiguous and
+    native-endian; no copy is made when it already is.
+    """
+    return np.ascontiguousarray(np.asarray(values, dtype=np.float64).ravel())
+
+
+def _h5_strings(h5_file, dataset) -> list:
+    """Decode a MATLAB v7.3 cell array of strings (references to uint16 char arrays)."""
+    return [''.join(map(chr, h5_file[ref][()].ravel())) for ref in dataset[()].ravel()]
+
+
+def _read_model_data_hdf5(mat_file: str):
+    """
+    Read the needed model_data fields from a MATLAB v7.3 (HDF5) file.
+    
+    Only the requested datasets are read. Returns (model_data, None), or
+    (None, available_keys) if there is no model_data. Raises OSError if
+    the file is not HDF5.
+    """
+    with h5py.File(mat_file, 'r') as f:
+        if 'model_data' not in f:
+            return None, list(f.keys())
+        model_struct = f['model_data']
+        
+        model_data = {}
+        for name in ('feature_names', 'class_names'):
+            if name in model_struct:
+                model_data[name] = _h5_strings(f, model_struct[name])
+        for name in ('scaler_mu', 'scaler_sigma'):
+            if name in model_struct:
+                model_data[name] = _as_float_vector(model_struct[name][()])
+        if 'classifier' in model_struct:
+            classifier = model_struct['classifier']
+            model_data['classifier'] = dict.fromkeys(classifier.keys()) if isinstance(classifier, h5py.Group) else classifier
+        return model_data, None
+
+
+def _read_model_data_mat(mat_file: str):
+    """Read only the model_data variable from a MATLAB v5/v7 file as plain Python types."""
+    mat_data = scipy.io.loadmat(mat_file, variable_names=['model_data'],
+                                squeeze_me=True, simplify_cells=True)
+    if 'model_data' not in mat_data:
+        return None, [name for name, _, _ in scipy.io.whosmat(mat_file)]
+    
+    model_data = dict(mat_data['model_data'])
+    for name in ('feature_names', 'class_names'):
+        if name in model_data:
+            # squeeze_me turns a one-element cell array into a bare string
+            names = model_data[name]
+            model_data[name] = [names] if isinstance(names, str) else [str(n) for n in names]
+    for name in ('scaler_mu', 'scaler_sigma'):
+        if name in model_data:
+            model_data[name] = _as_float_vector(model_data[name])
+    return model_data, None
+
+
+def _feature_order(model_data: dict):
+    """Feature names in model input order."""
+    feature_order = model_data['feature_names']
+    return feature_order, f"{len(feature_order)} features"
+
+
+def _scaler_params(model_data: dict):
+    """StandardScaler mean/scale."""
+    mu = model_data['scaler_mu']
+    return {
+        'mean': mu,
+        'scale': model_data['scaler_sigma'],
+        'n_features': int(mu.size)
+    }, "scaler parameters"
+
+
+def _class_encoder(model_data: dict):
+    """Class names in model output order."""
+    classes = model_data['class_names']
+    return {
+        'classes': classes,
+        'n_classes': len(classes)
+    }, f"{len(classes)} classes"
+
+
+def _coefficients_info(model_data: dict):
+    """Classifier field listing (placeholder until the export format is known)."""
+    # Coefficient extraction depends on how MATLAB exports the model (for
+    # fitglm models the fields might be Coefficients, Beta, etc.), so only
+    # the available fields are recorded for now
+    try:
+        classifier_data = model_data['classifier']
+        return {
+            'note': 'Coefficient extraction needs to be customized based on MATLAB export format',
+            'available_fields': list(classifier_data) if isinstance(classifier_data, dict) else 'N/A'
+        }, "coefficient info"
+    except Exception as e:
+        logger.warning(f"Could not extract coefficients: {e}")
+        return None, None
+
+
+# (model_data fields required, output file, builder returning (content, log summary))
+EXTRACTIONS = (
+    (('feature_names',), 'feature_order.json', _feature_order),
+    (('scaler_mu', 'scaler_sigma'), 'scaler_params.json', _scaler_params),
+    (('class_names',), 'class_encoder.json', _class_encoder),
+    (('classifier',), 'coefficients.json', _coefficients_info),
+)
+
+
 def extract_matlab_metadata(mat_file: str, output_dir: str):
     """
     Extract metadata from MATLAB .mat file.
@@ -35,89 +192,38 @@ def extract_matlab_metadata(mat_file: str, output_dir: str):
     logger.info(f"Extracting metadata from: {mat_file}")
     
     try:
-        # Load MATLAB file
-        mat_data = scipy.io.loadmat(mat_file)
+        # Read only the model_data fields that are exported: v7.3 files are
+        # HDF5 and are read dataset by dataset, older versions via loadmat
+        is_hdf5 = False
+        if H5PY_AVAILABLE:
+            try:
+                model_data, available_keys = _read_model_data_hdf5(mat_file)
+                is_hdf5 = True
+            except OSError:
+                pass
+        if not is_hdf5:
+            model_data, available_keys = _read_model_data_mat(mat_file)
         
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
         # Extract model data structure
-        if 'model_data' in mat_data:
-            model_struct = mat_data['model_data']
-            
-            # Extract feature names/order
-            if 'feature_names' in model_struct.dtype.names:
-                feature_names = model_struct['feature_names'][0, 0]
-                feature_order = [str(name[0]) for name in feature_names.flatten()]
-                
-                feature_order_file = output_path / 'feature_order.json'
-                with open(feature_order_file, 'w') as f:
-                    json.dump(feature_order, f, indent=2)
-                
-                logger.info(f"Feature order saved: {feature_order_file} ({len(feature_order)} features)")
-            
-            # Extract scaler parameters
-            if 'scaler_mu' in model_struct.dtype.names and 'scaler_sigma' in model_struct.dtype.names:
-                mu = model_struct['scaler_mu'][0, 0].flatten()
-                sigma = model_struct['scaler_sigma'][0, 0].flatten()
-                
-                scaler_params = {
-                    'mean': mu.tolist(),
-                    'scale': sigma.tolist(),
-                    'n_features': len(mu)
-                }
+        if model_data is not None:
+            for fields, filename, build in EXTRACTIONS:
+                if not all(field in model_data for field in fields):
+                    continue
                 
-                scaler_file = output_path / 'scaler_params.json'
-                with open(scaler_file, 'w') as f:
-                    json.dump(scaler_params, f, indent=2)
+                content, summary = build(model_data)
+                if content is None:
+                    continue
                 
-                logger.info(f"Scaler parameters saved: {scaler_file}")
-            
-            # Extract class names
-            if 'class_names' in model_struct.dtype.names:
-                class_names = model_struct['class_names'][0, 0]
-                classes = [str(name[0]) for name in class_names.flatten()]
-                
-                class_encoder = {
-                    'classes': classes,
-                    'n_classes': len(classes)
-                }
-                
-                encoder_file = output_path / 'class_encoder.json'
-                with open(encoder_file, 'w') as f:
-                    json.dump(class_encoder, f, indent=2)
-                
-                logger.info(f"Class encoder saved: {encoder_file} ({len(classes)} classes)")
-            
-            # Extract logistic regression coefficients if available
-            if 'classifier' in model_struct.dtype.names:
-                try:
-                    classifier_data = model_struct['classifier'][0, 0]
-                    
-                    # This part depends on how MATLAB exports the model
-                    # You may need to adapt this based on your specific export format
-                    
-                    # For fitglm models, coefficients might be in different fields
-                    # Common fields: Coefficients, Beta, etc.
-                    
-                    # Placeholder for coefficient extraction
-                    coefficients_info = {
-                        'note': 'Coefficient extraction needs to be customized based on MATLAB export format',
-                        'available_fields': list(classifier_data.dtype.names) if hasattr(classifier_data, 'dtype') else 'N/A'
-                    }
-                    
-                    coeff_file = output_path / 'coefficients.json'
-                    with open(coeff_file, 'w') as f:
-                        json.dump(coefficients_info, f, indent=2)
-                    
-                    logger.info(f"Coefficient info saved: {coeff_file}")
-                    
-                except Exception as e:
-                    logger.warning(f"Could not extract coefficients: {e}")
+                out_file = output_path / filename
+                out_file.write_bytes(_dumps(content))
+                logger.info(f"Saved {out_file}{f' ({summary})' if summary else ''}")
         
         else:
             logger.warning("No 'model_data' structure found in .mat file")
-            logger.info("Available keys: " + str(list(mat_data.keys())))
+            logger.info("Available keys: " + str(available_keys))
         
         logger.info("Metadata extraction completed")
         
@@ -133,37 +239,54 @@ def create_sample_metadata(output_dir: str):
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     
-    # Sample feature order (based on your MATLAB code)
-    feature_order = [
-        'packet_size', 'direction', 'inter_arrival_delta', 'tcp_flags_bitmap', 'ttl',
-        'total_bytes', 'total_packets', 'bytes_ratio', 'packets_per_second', 'syn_fin_ratio',
-        'size_mean', 'size_std', 'iat_mean', 'iat_std', 'burstiness',
-        'payload_entropy', 'printable_ratio'
-    ]
+    (output_path / 'feature_order.json').write_bytes(_dumps(FEATURE_ORDER))
+    (output_path / 'scaler_params.json').write_bytes(_dumps(SAMPLE_SCALER))
+    (output_path / 'class_encoder.json').write_bytes(_dumps(SAMPLE_CLASSES))
+    
+    logger.info(f"Sample metadata created in: {output_path}")
+
+
+def export_metadata_npz(metadata_dir: str, npz_file: str = None) -> Path:
+    """
+    Bundle exported JSON metadata into a single .npz file.
+    
+    The model adapter loads this with one np.load call instead of parsing
+    three JSON files, and the float arrays round-trip without text
+    conversion.
     
-    with open(output_path / 'feature_order.json', 'w') as f:
-        json.dump(feature_order, f, indent=2)
+    Args:
+        metadata_dir: Directory containing the exported JSON files
+        npz_file: Output path (defaults to metadata.npz in metadata_dir)
+        
+    Returns:
+        Path of the written bundle
+    """
+    metadata_path = Path(metadata_dir)
+    npz_path = Path(npz_file) if npz_file else metadata_path / 'metadata.npz'
     
-    # Sample scaler parameters
-    scaler_params = {
-        'mean': [0.0] * len(feature_order),
-        'scale': [1.0] * len(feature_order),
-        'n_features': len(feature_order)
-    }
+    arrays = {}
     
-    with open(output_path / 'scaler_params.json', 'w') as f:
-        json.dump(scaler_params, f, indent=2)
+    feature_order_file = metadata_path / 'feature_order.json'
+    if feature_order_file.exists():
+        with open(feature_order_file, 'r') as f:
+            arrays['feature_order'] = np.array(json.load(f), dtype=str)
     
-    # Sample class encoder
-    class_encoder = {
-        'classes': ['Normal', 'DoS', 'Exploits', 'Fuzzers', 'Generic', 'Reconnaissance'],
-        'n_classes': 6
-    }
+    scaler_file = metadata_path / 'scaler_params.json'
+    if scaler_file.exists():
+        with open(scaler_file, 'r') as f:
+            scaler_params = json.load(f)
+        arrays['mean'] = np.array(scaler_params['mean'], dtype=np.float64)
+        arrays['scale'] = np.array(scaler_params['scale'], dtype=np.float64)
     
-    with open(output_path / 'class_encoder.json', 'w') as f:
-        json.dump(class_encoder, f, indent=2)
+    encoder_file = metadata_path / 'class_encoder.json'
+    if encoder_file.exists():
+        with open(encoder_file, 'r') as f:
+            arrays['classes'] = np.array(json.load(f)['classes'], dtype=str)
     
-    logger.info(f"Sample metadata created in: {output_path}")
+    np.savez(npz_path, **arrays)
+    logger.info(f"Metadata bundle saved: {npz_path} ({', '.join(arrays)})")
+    
+    return npz_path
 
 
 def main():
@@ -173,11 +296,15 @@ def main():
     parser.add_argument("--output-dir", default="models", help="Output directory")
     parser.add_argument("--create-sample", action="store_true", 
                        help="Create sample metadata files for testing")
+    parser.add_argument("--npz", action="store_true",
+                       help="Also bundle the metadata into metadata.npz")
     
     args = parser.parse_args()
     
     if args.create_sample:
         create_sample_metadata(args.output_dir)
+        if args.npz:
+            export_metadata_npz(args.output_dir)
         return 0
     
     if not args.mat_file:
@@ -191,6 +318,8 @@ def main():
     
     try:
         extract_matlab_metadata(str(mat_file), args.output_dir)
+        if args.npz:
+            export_metadata_npz(args.output_dir)
         logger.info("Metadata export completed successfully!")
         return 0
         
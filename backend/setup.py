@@ -2,7 +2,7 @@
 Setup script for the Real-Time Network Intrusion Detection System.
 """
 
-from setuptools import setup, find_packages
+from setuptools import setup
 from pathlib import Path
 
 # Read README
@@ -25,13 +25,15 @@ setup(
     author="NIDS Team",
     author_email="nids@example.com",
     url="https://github.com/example/nids-realtime",
-    packages=find_packages(),
+    packages=["nids", "api"],
     include_package_data=True,
     install_requires=requirements,
     extras_require={
         'dev': [
             'pytest>=7.0.0',
             'pytest-cov>=4.0.0',
+            'pytest-xdist>=3.0.0',
+            'pytest-benchmark>=4.0.0',
             'black>=22.0.0',
             'flake8>=5.0.0',
             'mypy>=1.0.0',
@@ -42,6 +44,7 @@ setup(
         ],
         'performance': [
             'numba>=0.58.0',
+            'orjson>=3.8.0',
         ]
     },
     python_requires=">=3.8",
@@ -0,0 +1,67 @@
+"""
+Shared fixtures for the attack scenario tests.
+"""
+
+from dataclasses import replace
+from typing import Any, Dict
+from nids.features import FeatureExtractor
+from nids.models import SimpleModelAdapter
+from nids.alerts import AlertManager
+from nids.schemas import PacketInfo
+
+
+# Fields not given to create_packet come from this prototype, after the
+# scenario class's PACKET_DEFAULTS are applied
+_BASE_PACKET = PacketInfo(
+    timestamp=0.0,
+    src_ip="192.168.1.100",
+    dst_ip="10.0.0.1",
+    src_port=12345,
+    dst_port=80,
+    protocol="tcp",
+    packet_size=1000,
+    payload_size=500,
+    payload=b'',
+    tcp_flags=0x18,  # PSH+ACK
+    ttl=64
+)
+
+
+class AttackScenarioTest:
+    """
+    Base class for attack scenario test classes.
+    
+    The extractor, model and alert manager are built once per class and
+    reset before every test, so under pytest-xdist a scenario class must
+    stay on one worker: mark it with its own xdist_group and run with
+    --dist=loadgroup.
+    """
+    
+    # Sliding window of the shared FeatureExtractor
+    WINDOW_SIZE = 10
+    
+    # Per-scenario overrides of the packet template fields
+    PACKET_DEFAULTS: Dict[str, Any] = {}
+    
+    @classmethod
+    def setup_class(cls):
+        """Set up fixtures shared by every test in the class."""
+        cls.extractor = FeatureExtractor(window_size=cls.WINDOW_SIZE, use_numba=True)
+        cls.model = SimpleModelAdapter()
+        cls.alert_manager = AlertManager(toast_enabled=False, min_confidence=0.5)
+        cls._packet_template = replace(_BASE_PACKET, **cls.PACKET_DEFAULTS)
+    
+    @classmethod
+    def teardown_class(cls):
+        """Release the alert log file."""
+        cls.alert_manager.close()
+    
+    def setup_method(self):
+        """Clear state left behind by the previous test."""
+        self.extractor.reset()
+        self.model.reset()
+        self.alert_manager.clear()
+    
+    def create_packet(self, *, timestamp: float, **kwargs) -> PacketInfo:
+        """Create a test packet, copying unspecified fields from the template."""
+        return replace(self._packet_template, timestamp=timestamp, **kwargs)
@@ -5,173 +5,161 @@ Tests for Distributed Denial of Service attacks including volumetric, protocol,
 
 import pytest
 import time
-import random
-from nids.features import FeatureExtractor
-from nids.models import SimpleModelAdapter
-from nids.alerts import AlertManager
-from nids.schemas import PacketInfo, FlowKey
+from functools import lru_cache
+import numpy as np
+from .base import AttackScenarioTest
 
 
-class TestDDoSAttacks:
+# Seed for the per-test DDoS RNG
+DDOS_SEED = 42
+
+# Common UDP flood targets: DNS, NTP, SNMP, SSDP
+_UDP_TARGET_PORTS = (53, 123, 161, 1900)
+
+# Requests sent by the malformed HTTP flood (built once; one is 8 KB)
+_MALFORMED_REQUESTS = (
+    b"GET / HTTP/1.1\r\n\r\n",
+    b"POST / HTTP/1.1\r\nContent-Length: -1\r\n\r\n",
+    b"GET /" + b"A" * 8000 + b" HTTP/1.1\r\n\r\n",
+    b"\x00\x01\x02\x03 / HTTP/1.1\r\n\r\n",
+    b"GET / HTTP/999.999\r\n\r\n",
+)
+
+
+@lru_cache(maxsize=None)
+def _botnet_ips(count: int, seed: int) -> tuple:
+    """Botnet IP addresses, cycling through four address families."""
+    rng = np.random.default_rng(seed)
+    octets = rng.integers(1, 255, size=(count, 4))
+    family = np.arange(count) % 4
+    octets[family == 0, 0] = 192
+    octets[family == 0, 1] = 168
+    octets[family == 1, 0] = 10
+    octets[family == 2, 0] = 172
+    octets[family == 2, 1] = rng.integers(16, 32, size=np.count_nonzero(family == 2))
+    octets[family == 3, 0] = rng.integers(1, 224, size=np.count_nonzero(family == 3))
+    return tuple('.'.join(map(str, row)) for row in octets.tolist())
+
+
+@pytest.mark.xdist_group(name="ddos")
+class TestDDoSAttacks(AttackScenarioTest):
     """Test cases for DDoS attack detection."""
     
+    # Largest ICMP echo request payload; smaller ones are prefixes of it
+    _ICMP_ECHO = b'\x08\x00' + b'\x00' * 1490
+    
+    WINDOW_SIZE = 20  # Larger window for DDoS
+    PACKET_DEFAULTS = {
+        'payload_size': 100,
+        'payload': b'DDoS attack payload',
+        'tcp_flags': 0x02,  # SYN for most DDoS
+    }
+    
     def setup_method(self):
-        """Set up test fixtures."""
-        self.extractor = FeatureExtractor(window_size=20, use_numba=False)  # Larger window for DDoS
-        self.model = SimpleModelAdapter()
-        self.alert_manager = AlertManager(toast_enabled=False, min_confidence=0.5)
+        """Clear shared state and reseed the DDoS RNG."""
+        super().setup_method()
+        # Seeded per test, so results do not depend on test order or xdist worker
+        self.rng = np.random.default_rng(DDOS_SEED)
     
-    def create_packet(self, src_ip="192.168.1.100", dst_ip="10.0.0.1", 
-                     src_port=12345, dst_port=80, protocol="tcp", 
-                     packet_size=1000, timestamp=None, **kwargs):
-        """Create a test packet with default values."""
-        defaults = {
-            'timestamp': timestamp or time.time(),
-            'src_ip': src_ip,
-            'dst_ip': dst_ip,
-            'src_port': src_port,
-            'dst_port': dst_port,
-            'protocol': protocol,
-            'packet_size': packet_size,
-            'payload_size': 100,
-            'payload': b'DDoS attack payload',
-            'tcp_flags': 0x02,  # SYN for most DDoS
-            'ttl': 64
-        }
-        defaults.update(kwargs)
-        return PacketInfo(**defaults)
+    def generate_botnet_ips(self, count: int, seed: int = None) -> list:
+        """Generate list of botnet IP addresses (same list for the same count and seed)."""
+        return list(_botnet_ips(count, count if seed is None else seed))
     
-    def generate_botnet_ips(self, count: int) -> list:
-        """Generate list of botnet IP addresses."""
-        ips = []
-        for i in range(count):
-            # Generate diverse IP ranges
-            if i % 4 == 0:
-                ip = f"192.168.{random.randint(1, 254)}.{random.randint(1, 254)}"
-            elif i % 4 == 1:
-                ip = f"10.{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}"
-            elif i % 4 == 2:
-                ip = f"172.{random.randint(16, 31)}.{random.randint(1, 254)}.{random.randint(1, 254)}"
-            else:
-                ip = f"{random.randint(1, 223)}.{random.randint(1, 254)}.{random.randint(1, 254)}.{random.randint(1, 254)}"
-            ips.append(ip)
-        return ips
+    def _syn_flood_packet(self, i, src_ip, src_port, base_time):
+        """SYN flood packet: small SYNs at 10ms intervals."""
+        return self.create_packet(
+            src_ip=src_ip,
+            dst_ip="10.0.0.1",
+            src_port=src_port,
+            dst_port=80,
+            packet_size=64,  # Small SYN packets
+            tcp_flags=0x02,  # SYN only
+            timestamp=base_time + i * 0.01,  # 10ms intervals - very fast
+            payload=b'',
+            payload_size=0
+        )
     
-    def test_syn_flood_typical(self):
-        """Test typical SYN flood attack from multiple sources."""
-        base_time = time.time()
-        packets = []
-        
-        # Generate SYN flood from multiple sources
-        botnet_ips = self.generate_botnet_ips(50)
-        
-        for i, src_ip in enumerate(botnet_ips):
-            packet = self.create_packet(
-                src_ip=src_ip,
-                dst_ip="10.0.0.1",
-                src_port=random.randint(1024, 65535),
-                dst_port=80,
-                packet_size=64,  # Small SYN packets
-                tcp_flags=0x02,  # SYN only
-                timestamp=base_time + i * 0.01,  # 10ms intervals - very fast
-                payload=b'',
-                payload_size=0
-            )
-            packets.append(packet)
-        
-        # Process SYN flood
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
-        
-        # Should detect high packet rate
-        attack_predictions = [p for p in predictions if p.is_attack]
-        assert len(attack_predictions) > 0, "Should detect SYN flood attack"
-        
-        # Check packet rate detection
-        if len(packets) > 10:
-            final_features = self.extractor.extract_features(packets[-1])
-            assert final_features.packets_per_second > 100, f"Should detect high packet rate, got {final_features.packets_per_second}"
+    def _udp_flood_packet(self, i, src_ip, src_port, base_time):
+        """UDP flood packet: random payload to a common UDP service."""
+        payload_size = int(self.rng.integers(100, 1401))
+        payload = self.rng.bytes(payload_size)
+        
+        return self.create_packet(
+            src_ip=src_ip,
+            dst_ip="10.0.0.1",
+            src_port=src_port,
+            dst_port=int(self.rng.choice(_UDP_TARGET_PORTS)),
+            protocol="udp",
+            packet_size=payload_size + 28,  # UDP + IP headers
+            payload=payload,
+            payload_size=payload_size,
+            timestamp=base_time + i * 0.02  # 20ms intervals
+        )
     
-    def test_udp_flood_typical(self):
-        """Test typical UDP flood attack."""
-        base_time = time.time()
-        packets = []
-        
-        # Generate UDP flood
-        botnet_ips = self.generate_botnet_ips(30)
-        
-        for i, src_ip in enumerate(botnet_ips):
-            # Random UDP payload
-            payload_size = random.randint(100, 1400)
-            payload = bytes([random.randint(0, 255) for _ in range(payload_size)])
-            
-            packet = self.create_packet(
-                src_ip=src_ip,
-                dst_ip="10.0.0.1",
-                src_port=random.randint(1024, 65535),
-                dst_port=random.choice([53, 123, 161, 1900]),  # Common UDP targets
-                protocol="udp",
-                packet_size=payload_size + 28,  # UDP + IP headers
-                payload=payload,
-                payload_size=payload_size,
-                timestamp=base_time + i * 0.02  # 20ms intervals
-            )
-            packets.append(packet)
-        
-        # Process UDP flood
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
-        
-        # Should detect UDP flood
-        attack_predictions = [p for p in predictions if p.is_attack]
-        assert len(attack_predictions) > 0, "Should detect UDP flood attack"
+    def _icmp_flood_packet(self, i, src_ip, src_port, base_time):
+        """ICMP flood packet: echo requests of varying sizes."""
+        # Vary ICMP packet sizes
+        if i % 3 == 0:
+            packet_size = 64   # Small ping
+        elif i % 3 == 1:
+            packet_size = 1500  # Large ping
+        else:
+            packet_size = int(self.rng.integers(100, 1401))
+        
+        return self.create_packet(
+            src_ip=src_ip,
+            dst_ip="10.0.0.1",
+            src_port=0,  # ICMP doesn't use ports
+            dst_port=0,
+            protocol="icmp",
+            packet_size=packet_size,
+            payload=self._ICMP_ECHO[:packet_size - 8],  # ICMP echo request
+            payload_size=packet_size - 8,  # Minus ICMP header
+            timestamp=base_time + i * 0.05  # 50ms intervals
+        )
+    
+    def _volumetric_packet(self, i, src_ip, src_port, base_time):
+        """Volumetric flood packet: minimum-size SYNs at 1ms intervals."""
+        # Very small packets for maximum PPS
+        return self.create_packet(
+            src_ip=src_ip,
+            dst_ip="10.0.0.1",
+            src_port=src_port,
+            dst_port=80,
+            packet_size=40,  # Minimum size
+            payload=b'',
+            payload_size=0,
+            tcp_flags=0x02,
+            timestamp=base_time + i * 0.001  # 1ms intervals - extremely fast
+        )
     
-    def test_icmp_flood_edge_case(self):
-        """Test ICMP flood with various packet sizes."""
+    @pytest.mark.parametrize("builder,botnet_size,min_final_pps,attack_name", [
+        pytest.param("_syn_flood_packet", 50, 100, "SYN flood", id="syn_flood_typical"),
+        pytest.param("_udp_flood_packet", 30, None, "UDP flood", id="udp_flood_typical"),
+        pytest.param("_icmp_flood_packet", 25, None, "ICMP flood", id="icmp_flood_edge_case"),
+        pytest.param("_volumetric_packet", 200, 500, "extreme volumetric", id="volumetric_attack_edge_case"),
+    ])
+    def test_single_vector_flood(self, builder, botnet_size, min_final_pps, attack_name):
+        """Test single-vector floods (SYN, UDP, ICMP, volumetric) from a botnet."""
         base_time = time.time()
-        packets = []
+        build_packet = getattr(self, builder)
         
-        # Generate ICMP flood with varying sizes
-        botnet_ips = self.generate_botnet_ips(25)
+        botnet_ips = self.generate_botnet_ips(botnet_size)
+        src_ports = self.rng.integers(1024, 65536, size=len(botnet_ips)).tolist()
         
-        for i, src_ip in enumerate(botnet_ips):
-            # Vary ICMP packet sizes
-            if i % 3 == 0:
-                packet_size = 64   # Small ping
-            elif i % 3 == 1:
-                packet_size = 1500  # Large ping
-            else:
-                packet_size = random.randint(100, 1400)
-            
-            packet = self.create_packet(
-                src_ip=src_ip,
-                dst_ip="10.0.0.1",
-                src_port=0,  # ICMP doesn't use ports
-                dst_port=0,
-                protocol="icmp",
-                packet_size=packet_size,
-                payload=b'\\x08\\x00' + b'\\x00' * (packet_size - 10),  # ICMP echo request
-                payload_size=packet_size - 8,  # Minus ICMP header
-                timestamp=base_time + i * 0.05  # 50ms intervals
-            )
-            packets.append(packet)
-        
-        # Process ICMP flood
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        # Packets are streamed straight into the extractor
+        packets = (build_packet(i, src_ip, src_ports[i], base_time)
+                   for i, src_ip in enumerate(botnet_ips))
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
-        # Should detect ICMP flood
         attack_predictions = [p for p in predictions if p.is_attack]
-        assert len(attack_predictions) > 0, "Should detect ICMP flood attack"
+        assert len(attack_predictions) > 0, f"Should detect {attack_name} attack"
+        
+        # Check packet rate detection on the last packet
+        if min_final_pps is not None:
+            final_features = features[-1]
+            assert final_features.packets_per_second > min_final_pps, f"Should detect high packet rate, got {final_features.packets_per_second}"
     
     def test_amplification_attack_typical(self):
         """Test DNS/NTP amplification attack."""
@@ -180,18 +168,21 @@ class TestDDoSAttacks:
         
         # Simulate amplification attack - small requests, large responses
         amplification_targets = [
-            ("8.8.8.8", 53, b'\\x12\\x34\\x01\\x00\\x00\\x01\\x00\\x00\\x00\\x00\\x00\\x00\\x07version\\x04bind\\x00\\x00\\x10\\x00\\x03'),  # DNS
-            ("pool.ntp.org", 123, b'\\x17\\x00\\x03\\x2a' + b'\\x00' * 44),  # NTP monlist
+            ("8.8.8.8", 53, b'\x12\x34\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00\x07version\x04bind\x00\x00\x10\x00\x03'),  # DNS
+            ("pool.ntp.org", 123, b'\x17\x00\x03\x2a' + b'\x00' * 44),  # NTP monlist
         ]
         
         # Generate amplification requests (spoofed source)
+        target_idx = self.rng.integers(0, len(amplification_targets), size=20).tolist()
+        src_ports = self.rng.integers(1024, 65536, size=20).tolist()
+        
         for i in range(20):
-            target_ip, target_port, request_payload = random.choice(amplification_targets)
+            target_ip, target_port, request_payload = amplification_targets[target_idx[i]]
             
             packet = self.create_packet(
                 src_ip="10.0.0.1",  # Spoofed victim IP
                 dst_ip=target_ip,
-                src_port=random.randint(1024, 65535),
+                src_port=src_ports[i],
                 dst_port=target_port,
                 protocol="udp",
                 packet_size=len(request_payload) + 28,
@@ -202,15 +193,21 @@ class TestDDoSAttacks:
             packets.append(packet)
         
         # Generate amplified responses (large)
+        responders = ("8.8.8.8", "pool.ntp.org")
+        service_ports = (53, 123)
+        responder_idx = self.rng.integers(0, 2, size=20).tolist()
+        port_idx = self.rng.integers(0, 2, size=20).tolist()
+        dst_ports = self.rng.integers(1024, 65536, size=20).tolist()
+        
         for i in range(20):
             # Large response payload
-            response_payload = b'\\x12\\x34\\x81\\x80' + b'A' * 1400  # Large DNS/NTP response
+            response_payload = b'\x12\x34\x81\x80' + b'A' * 1400  # Large DNS/NTP response
             
             packet = self.create_packet(
-                src_ip=random.choice(["8.8.8.8", "pool.ntp.org"]),
+                src_ip=responders[responder_idx[i]],
                 dst_ip="10.0.0.1",  # Victim
-                src_port=random.choice([53, 123]),
-                dst_port=random.randint(1024, 65535),
+                src_port=service_ports[port_idx[i]],
+                dst_port=dst_ports[i],
                 protocol="udp",
                 packet_size=len(response_payload) + 28,
                 payload=response_payload,
@@ -220,11 +217,8 @@ class TestDDoSAttacks:
             packets.append(packet)
         
         # Process amplification attack
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Should detect amplification patterns
         attack_predictions = [p for p in predictions if p.is_attack]
@@ -238,15 +232,17 @@ class TestDDoSAttacks:
         # Slowloris: many partial HTTP requests
         botnet_ips = self.generate_botnet_ips(100)
         
+        src_ports = self.rng.integers(1024, 65536, size=len(botnet_ips)).tolist()
+        
         for i, src_ip in enumerate(botnet_ips):
             # Partial HTTP request
-            partial_request = b"GET / HTTP/1.1\\r\\nHost: target.com\\r\\nUser-Agent: Mozilla/5.0\\r\\nAccept: */*\\r\\n"
-            # Note: Missing final \\r\\n to keep connection open
+            partial_request = b"GET / HTTP/1.1\r\nHost: target.com\r\nUser-Agent: Mozilla/5.0\r\nAccept: */*\r\n"
+            # Note: Missing final \r\n to keep connection open
             
             packet = self.create_packet(
                 src_ip=src_ip,
                 dst_ip="10.0.0.1",
-                src_port=random.randint(1024, 65535),
+                src_port=src_ports[i],
                 dst_port=80,
                 packet_size=len(partial_request) + 40,
                 payload=partial_request,
@@ -257,11 +253,8 @@ class TestDDoSAttacks:
             packets.append(packet)
         
         # Process Slowloris attack
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Slowloris might not be detected due to low rate, but should process
         assert len(predictions) == len(packets), "Should process all Slowloris packets"
@@ -276,23 +269,18 @@ class TestDDoSAttacks:
         packets = []
         
         # Generate malformed HTTP flood
-        malformed_requests = [
-            b"GET / HTTP/1.1\\r\\n\\r\\n",
-            b"POST / HTTP/1.1\\r\\nContent-Length: -1\\r\\n\\r\\n",
-            b"GET /" + b"A" * 8000 + b" HTTP/1.1\\r\\n\\r\\n",
-            b"\\x00\\x01\\x02\\x03 / HTTP/1.1\\r\\n\\r\\n",
-            b"GET / HTTP/999.999\\r\\n\\r\\n",
-        ]
-        
         botnet_ips = self.generate_botnet_ips(50)
         
+        src_ports = self.rng.integers(1024, 65536, size=len(botnet_ips)).tolist()
+        request_idx = self.rng.integers(0, len(_MALFORMED_REQUESTS), size=len(botnet_ips)).tolist()
+        
         for i, src_ip in enumerate(botnet_ips):
-            malformed_request = random.choice(malformed_requests)
+            malformed_request = _MALFORMED_REQUESTS[request_idx[i]]
             
             packet = self.create_packet(
                 src_ip=src_ip,
                 dst_ip="10.0.0.1",
-                src_port=random.randint(1024, 65535),
+                src_port=src_ports[i],
                 dst_port=80,
                 packet_size=len(malformed_request) + 40,
                 payload=malformed_request,
@@ -303,11 +291,8 @@ class TestDDoSAttacks:
             packets.append(packet)
         
         # Process malformed HTTP flood
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Should detect HTTP flood
         attack_predictions = [p for p in predictions if p.is_attack]
@@ -337,7 +322,7 @@ class TestDDoSAttacks:
                 )
             elif i % 3 == 1:
                 # UDP flood
-                udp_payload = bytes([random.randint(0, 255) for _ in range(500)])
+                udp_payload = self.rng.bytes(500)
                 packet = self.create_packet(
                     src_ip=src_ip,
                     dst_ip="10.0.0.1",
@@ -357,7 +342,7 @@ class TestDDoSAttacks:
                     dst_port=0,
                     protocol="icmp",
                     packet_size=1000,
-                    payload=b'\\x08\\x00' + b'\\x00' * 990,
+                    payload=b'\x08\x00' + b'\x00' * 990,
                     payload_size=992,
                     timestamp=base_time + i * 0.01
                 )
@@ -365,11 +350,8 @@ class TestDDoSAttacks:
             packets.append(packet)
         
         # Process mixed protocol DDoS
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Should detect mixed protocol attack
         attack_predictions = [p for p in predictions if p.is_attack]
@@ -377,7 +359,7 @@ class TestDDoSAttacks:
         
         # Check high packet rate
         if len(packets) > 20:
-            final_features = self.extractor.extract_features(packets[-1])
+            final_features = features[-1]
             assert final_features.packets_per_second > 50, "Should detect high packet rate in mixed attack"
     
     def test_reflection_attack_typical(self):
@@ -387,19 +369,22 @@ class TestDDoSAttacks:
         
         # Reflection attack: requests to legitimate servers with spoofed source
         reflection_services = [
-            ("8.8.8.8", 53, b'\\x12\\x34\\x01\\x00\\x00\\x01\\x00\\x00\\x00\\x00\\x00\\x00\\x03www\\x06google\\x03com\\x00\\x00\\x01\\x00\\x01'),
-            ("1.1.1.1", 53, b'\\x56\\x78\\x01\\x00\\x00\\x01\\x00\\x00\\x00\\x00\\x00\\x00\\x07example\\x03com\\x00\\x00\\x01\\x00\\x01'),
-            ("time.nist.gov", 123, b'\\x1b\\x00\\x00\\x00' + b'\\x00' * 44),
+            ("8.8.8.8", 53, b'\x12\x34\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00\x03www\x06google\x03com\x00\x00\x01\x00\x01'),
+            ("1.1.1.1", 53, b'\x56\x78\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00\x07example\x03com\x00\x00\x01\x00\x01'),
+            ("time.nist.gov", 123, b'\x1b\x00\x00\x00' + b'\x00' * 44),
         ]
         
         # Generate reflection requests
+        service_idx = self.rng.integers(0, len(reflection_services), size=30).tolist()
+        src_ports = self.rng.integers(1024, 65536, size=30).tolist()
+        
         for i in range(30):
-            server_ip, server_port, request_payload = random.choice(reflection_services)
+            server_ip, server_port, request_payload = reflection_services[service_idx[i]]
             
             packet = self.create_packet(
                 src_ip="10.0.0.1",  # Spoofed victim IP
                 dst_ip=server_ip,
-                src_port=random.randint(1024, 65535),
+                src_port=src_ports[i],
                 dst_port=server_port,
                 protocol="udp",
                 packet_size=len(request_payload) + 28,
@@ -410,55 +395,13 @@ class TestDDoSAttacks:
             packets.append(packet)
         
         # Process reflection attack
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Reflection attack might not be detected from requester side
         # But should process without errors
         assert len(predictions) == len(packets), "Should process all reflection packets"
     
-    def test_volumetric_attack_edge_case(self):
-        """Test extreme volumetric attack with massive packet rates."""
-        base_time = time.time()
-        packets = []
-        
-        # Extreme volumetric attack
-        botnet_ips = self.generate_botnet_ips(200)  # Large botnet
-        
-        for i, src_ip in enumerate(botnet_ips):
-            # Very small packets for maximum PPS
-            packet = self.create_packet(
-                src_ip=src_ip,
-                dst_ip="10.0.0.1",
-                src_port=random.randint(1024, 65535),
-                dst_port=80,
-                packet_size=40,  # Minimum size
-                payload=b'',
-                payload_size=0,
-                tcp_flags=0x02,
-                timestamp=base_time + i * 0.001  # 1ms intervals - extremely fast
-            )
-            packets.append(packet)
-        
-        # Process volumetric attack
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
-        
-        # Should detect extreme volumetric attack
-        attack_predictions = [p for p in predictions if p.is_attack]
-        assert len(attack_predictions) > 0, "Should detect extreme volumetric attack"
-        
-        # Check extreme packet rate
-        if len(packets) > 50:
-            final_features = self.extractor.extract_features(packets[-1])
-            assert final_features.packets_per_second > 500, f"Should detect extreme packet rate, got {final_features.packets_per_second}"
-    
     def test_ddos_alert_generation(self):
         """Test that DDoS attacks generate appropriate alerts."""
         base_time = time.time()
@@ -467,11 +410,13 @@ class TestDDoSAttacks:
         # Generate clear DDoS pattern
         botnet_ips = self.generate_botnet_ips(20)
         
+        src_ports = self.rng.integers(1024, 65536, size=len(botnet_ips)).tolist()
+        
         for i, src_ip in enumerate(botnet_ips):
             packet = self.create_packet(
                 src_ip=src_ip,
                 dst_ip="10.0.0.1",
-                src_port=random.randint(1024, 65535),
+                src_port=src_ports[i],
                 dst_port=80,
                 packet_size=64,
                 tcp_flags=0x02,
@@ -542,7 +487,7 @@ class TestDDoSAttacks:
                 src_ip=src_ip,
                 dst_ip="10.0.0.1",
                 dst_port=80,
-                payload=b"GET / HTTP/1.1\\r\\nHost: target\\r\\n\\r\\n",
+                payload=b"GET / HTTP/1.1\r\nHost: target\r\n\r\n",
                 payload_size=35,
                 tcp_flags=0x18,
                 timestamp=base_time + i * 0.01
@@ -550,14 +495,12 @@ class TestDDoSAttacks:
             packets.append(packet)
         
         # Sort packets by timestamp to simulate real attack
-        packets.sort(key=lambda p: p.timestamp)
+        timestamps = np.fromiter((p.timestamp for p in packets), dtype=np.float64, count=len(packets))
+        packets = [packets[i] for i in timestamps.argsort(kind='stable').tolist()]
         
         # Process coordinated attack
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Should detect coordinated attack
         attack_predictions = [p for p in predictions if p.is_attack]
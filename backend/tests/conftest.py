@@ -0,0 +1,28 @@
+"""
+Shared pytest fixtures for the NIDS test suite.
+"""
+
+import pytest
+import time
+from nids.features import FeatureExtractor, NUMBA_AVAILABLE
+from nids.schemas import PacketInfo
+
+
+@pytest.fixture(scope="session", autouse=True)
+def warmup_numba():
+    """Compile the numba feature kernels once, before any test extracts features."""
+    if not NUMBA_AVAILABLE:
+        return
+    
+    extractor = FeatureExtractor(use_numba=True)
+    extractor.extract_features(PacketInfo(
+        timestamp=time.time(),
+        src_ip='192.168.1.100',
+        dst_ip='10.0.0.1',
+        src_port=12345,
+        dst_port=80,
+        protocol='tcp',
+        packet_size=100,
+        payload_size=16,
+        payload=b'numba warm-up...'
+    ))
@@ -4,28 +4,43 @@ Unit tests for alert management module.
 
 import pytest
 import time
-import tempfile
 import json
-from pathlib import Path
 from nids.alerts import AlertManager
 from nids.schemas import ModelPrediction, FlowKey
 
 
+class FakeClock:
+    """Manually advanced clock for cooldown tests."""
+    
+    def __init__(self):
+        self.t = 0.0
+    
+    def __call__(self) -> float:
+        return self.t
+    
+    def advance(self, dt: float):
+        self.t += dt
+
+
 class TestAlertManager:
     """Test cases for AlertManager class."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        # Use temporary directory for test logs
-        self.temp_dir = tempfile.mkdtemp()
-        self.log_file = Path(self.temp_dir) / "test_alerts.jsonl"
+    @pytest.fixture(autouse=True)
+    def _setup(self, tmp_path):
+        """Set up test fixtures and release the alert log file afterwards."""
+        # pytest removes tmp_path, so test logs don't pile up between runs
+        self.log_file = tmp_path / "test_alerts.jsonl"
+        self.clock = FakeClock()
         
         self.alert_manager = AlertManager(
             toast_enabled=False,  # Disable for testing
             log_file=str(self.log_file),
             min_confidence=0.7,
-            cooldown_seconds=5
+            cooldown_seconds=5,
+            clock=self.clock
         )
+        yield
+        self.alert_manager.close()
     
     def create_test_prediction(self, **kwargs):
         """Create test model prediction."""
@@ -94,7 +109,7 @@ class TestAlertManager:
         assert alert2 is None  # Should be blocked by cooldown
         
         # Wait for cooldown to expire
-        time.sleep(6)  # Cooldown is 5 seconds
+        self.clock.advance(6)  # Cooldown is 5 seconds
         
         # Generate third alert
         alert3 = self.alert_manager.generate_alert(prediction)
@@ -215,8 +230,8 @@ class TestAlertManager:
             )
             predictions.append(prediction)
             
-            # Wait to avoid cooldown
-            time.sleep(0.1)
+            # Step the clock to avoid cooldown
+            self.clock.advance(0.1)
         
         # Generate alerts
         alerts = []
@@ -253,7 +268,7 @@ class TestAlertManager:
             )
             
             self.alert_manager.generate_alert(prediction)
-            time.sleep(0.1)  # Avoid cooldown
+            self.clock.advance(0.1)  # Avoid cooldown
         
         # Get statistics
         stats = self.alert_manager.get_alert_stats()
@@ -280,7 +295,28 @@ class TestAlertManager:
         assert len(self.alert_manager.recent_alerts) > 0
         
         # Cleanup with very short max age
+        self.clock.advance(1)
         self.alert_manager.cleanup_old_alerts(max_age_seconds=0)
         
         # Should have cleaned up tracking data
-        assert len(self.alert_manager.recent_alerts) == 0
\ No newline at end of file
+        assert len(self.alert_manager.recent_alerts) == 0
+    
+    def test_cooldown_entries_expire(self):
+        """Test that cooldown tracking only keeps entries still in cooldown."""
+        for i in range(3):
+            prediction = self.create_test_prediction(
+                flow_key=FlowKey(
+                    src_ip=f'192.168.1.{10+i}',
+                    dst_ip='10.0.0.1',
+                    src_port=12345,
+                    dst_port=80,
+                    protocol='tcp'
+                )
+            )
+            assert self.alert_manager.generate_alert(prediction) is not None
+            self.clock.advance(2)
+        
+        # First source alerted 6s ago (past the 5s cooldown), the others 4s and 2s ago
+        assert self.alert_manager.generate_alert(self.create_test_prediction()) is not None
+        assert len(self.alert_manager.recent_alerts) == 3
+        assert ('192.168.1.10', '10.0.0.1', 'DoS') not in self.alert_manager.recent_alerts
\ No newline at end of file
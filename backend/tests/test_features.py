@@ -4,7 +4,8 @@ Unit tests for feature extraction module.
 
 import pytest
 import time
-from nids.features import FeatureExtractor
+import numpy as np
+from nids.features import FeatureExtractor, _payload_stats_kernel
 from nids.schemas import PacketInfo
 
 
@@ -30,7 +31,7 @@ class TestFeatureExtractor:
             'protocol': 'tcp',
             'packet_size': 1000,
             'payload_size': 500,
-            'payload': b'GET / HTTP/1.1\\r\\n\\r\\n',
+            'payload': b'GET / HTTP/1.1\r\n\r\n',
             'tcp_flags': 0x18,  # PSH+ACK
             'ttl': 64
         }
@@ -70,8 +71,7 @@ class TestFeatureExtractor:
             timestamp=packet1.timestamp + 0.1
         )
         
-        features1 = self.extractor.extract_features(packet1)
-        features2 = self.extractor.extract_features(packet2)
+        features1, features2 = self.extractor.extract_features_batch([packet1, packet2])
         
         # Check flow key consistency
         assert features1.flow_key == features2.flow_key
@@ -93,10 +93,7 @@ class TestFeatureExtractor:
             packets.append(packet)
         
         # Process all packets
-        features_list = []
-        for packet in packets:
-            features = self.extractor.extract_features(packet)
-            features_list.append(features)
+        features_list = self.extractor.extract_features_batch(packets)
         
         # Check that window features are calculated
         final_features = features_list[-1]
@@ -201,12 +198,83 @@ class TestFeatureExtractor:
         assert feature_array[0] == features.packet_size
         assert feature_array[1] == features.direction
     
+    def test_extract_features_batch(self):
+        """Test batch extraction matches per-packet extraction."""
+        base_time = time.time()
+        packets = [
+            self.create_test_packet(
+                timestamp=base_time + i * 0.1,
+                src_port=12345 + i % 3,
+                payload=b'\x90' * 50 if i % 2 else b'GET / HTTP/1.1'
+            )
+            for i in range(12)
+        ]
+
+        batch = self.extractor.extract_features_batch(packets)
+
+        reference = FeatureExtractor(window_size=5, session_timeout=60.0, use_numba=False)
+        expected = [reference.extract_features(packet) for packet in packets]
+
+        assert batch == expected
+        assert self.extractor.get_flow_count() == 3
+
+    def test_payload_stats_kernel(self):
+        """Test the numba payload kernel matches the Python implementation."""
+        for payload in [b'GET / HTTP/1.1', bytes(range(256)), b'\x90' * 50 + b'abc']:
+            entropy, printable_ratio = _payload_stats_kernel(np.frombuffer(payload, dtype=np.uint8))
+            assert entropy == pytest.approx(self.extractor._calculate_entropy(payload))
+            assert printable_ratio == pytest.approx(
+                sum(1 for b in payload if 32 <= b <= 126) / len(payload)
+            )
+
+    def test_running_window_stats(self):
+        """Test window statistics from running sums match a direct computation."""
+        for count in [1, 2, 5, 12]:
+            packets = [
+                self.create_test_packet(packet_size=100 + 37 * i % 900, timestamp=1000.0 + 0.01 * i * i)
+                for i in range(count)
+            ]
+            features = self.extractor.extract_features_batch(packets)[-1]
+            sizes = [p.packet_size for p in packets][-self.extractor.window_size:]
+            iats = np.diff([p.timestamp for p in packets])[-self.extractor.window_size:]
+            assert features.size_mean == pytest.approx(np.mean(sizes))
+            assert features.size_std == pytest.approx(np.std(sizes))
+            if count > 1:
+                assert features.iat_mean == pytest.approx(np.mean(iats))
+                assert features.iat_std == pytest.approx(np.std(iats))
+            self.extractor.reset()
+    
+    def test_window_std_after_outlier_leaves(self):
+        """Test a large value leaving the window leaves no residue in the statistics."""
+        timestamps = [1000.0, 1033.3] + [1033.3 + 0.001 * i for i in range(1, 13)]
+        packets = [
+            self.create_test_packet(packet_size=60000 if i == 1 else 64, timestamp=ts)
+            for i, ts in enumerate(timestamps)
+        ]
+        features = self.extractor.extract_features_batch(packets)[-1]
+        
+        assert features.size_mean == 64.0
+        assert features.size_std == 0.0
+        assert features.iat_mean == pytest.approx(0.001)
+        assert features.iat_std == 0.0
+        assert features.burstiness == 0.0
+    
+    def test_numba_path_matches_python(self):
+        """Test payload features agree with and without numba."""
+        jit_extractor = FeatureExtractor(window_size=5, session_timeout=60.0, use_numba=True)
+        for payload in [b'GET / HTTP/1.1', bytes(range(256)) * 2, b'\x90' * 100 + b'\xcc']:
+            packet = self.create_test_packet(payload=payload, payload_size=len(payload))
+            expected = self.extractor.extract_features(packet)
+            actual = jit_extractor.extract_features(packet)
+            assert actual.payload_entropy == pytest.approx(expected.payload_entropy)
+            assert actual.printable_ratio == pytest.approx(expected.printable_ratio)
+
     def test_reset(self):
         """Test feature extractor reset."""
         # Create some flows
-        for i in range(5):
-            packet = self.create_test_packet(src_ip=f'192.168.1.{i}')
-            self.extractor.extract_features(packet)
+        self.extractor.extract_features_batch(
+            self.create_test_packet(src_ip=f'192.168.1.{i}') for i in range(5)
+        )
         
         assert self.extractor.get_flow_count() == 5
         
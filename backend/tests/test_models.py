@@ -4,7 +4,8 @@ Unit tests for model adapter module.
 
 import pytest
 import time
-from nids.models import SimpleModelAdapter
+import numpy as np
+from nids.models import SimpleModelAdapter, _tree_arrays, _tree_predict_proba
 from nids.schemas import PacketInfo, FeatureVector, FlowKey
 
 
@@ -205,4 +206,59 @@ class TestSimpleModelAdapter:
         prob_std = sum((p - probabilities[0])**2 for p in probabilities) ** 0.5
         
         # Standard deviation should be small (allowing for randomness in simple model)
-        assert prob_std < 0.2
\ No newline at end of file
+        assert prob_std < 0.2
+    
+    def test_predict_batch_matches_predict(self):
+        """Batch prediction should match per-vector prediction."""
+        features_list = [
+            self.create_test_features(packet_size=float(size), payload_entropy=entropy)
+            for size, entropy in [(1000.0, 4.0), (40.0, 7.9), (1500.0, 2.0)]
+        ]
+        
+        batch_predictions = self.adapter.predict_batch(features_list)
+        reference = SimpleModelAdapter()
+        single_predictions = [reference.predict(f) for f in features_list]
+        
+        assert len(batch_predictions) == len(features_list)
+        for batch, single in zip(batch_predictions, single_predictions):
+            assert batch.is_attack == single.is_attack
+            assert batch.attack_probability == single.attack_probability
+            assert batch.attack_class == single.attack_class
+        assert self.adapter.predict_batch([]) == []
+    
+    def test_reset(self):
+        """Reset should make the adapter behave like a fresh one."""
+        features_list = [
+            self.create_test_features(timestamp=1000.0 + i * 0.01, packet_size=64.0)
+            for i in range(20)
+        ]
+        self.adapter.predict_batch(features_list)
+        
+        self.adapter.reset()
+        
+        assert self.adapter.packet_count == 0
+        assert self.adapter._flow_ids == {}
+        reference = SimpleModelAdapter()
+        for mine, fresh in zip(self.adapter.predict_batch(features_list),
+                               reference.predict_batch(features_list)):
+            assert mine.attack_probability == fresh.attack_probability
+
+
+class TestTreeKernel:
+    """Test cases for the decision tree traversal kernel."""
+    
+    def test_matches_sklearn_predict_proba(self):
+        """Kernel output should match DecisionTreeClassifier.predict_proba."""
+        tree_module = pytest.importorskip("sklearn.tree")
+        
+        rng = np.random.RandomState(0)
+        X = rng.randn(300, 5).astype(np.float32)
+        y = rng.randint(0, 4, 300)
+        
+        model = tree_module.DecisionTreeClassifier(max_depth=5).fit(X, y)
+        
+        expected = model.predict_proba(X)
+        actual = _tree_predict_proba(X, *_tree_arrays(model))
+        
+        assert actual.shape == expected.shape
+        assert np.allclose(actual, expected)